@@ -0,0 +1,22 @@
+# Generated by Django 4.2.25 on 2026-10-19 05:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_preferred_theme'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='user',
+            options={'ordering': ['-date_joined'], 'permissions': [('can_manage_users', 'Can manage users'), ('can_manage_confessions', 'Can manage confessions'), ('can_view_analytics', 'Can view analytics'), ('can_manage_posts', 'Can manage posts'), ('can_moderate_comments', 'Can moderate comments')]},
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='last_seen_notification_id',
+            field=models.PositiveBigIntegerField(default=0, help_text='Notifications with an id up to this value are treated as read'),
+        ),
+    ]
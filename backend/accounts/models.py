@@ -26,6 +26,10 @@ class User(AbstractUser):
     is_active = models.BooleanField(default=True)
     preferred_language = models.CharField(max_length=5, choices=LANGUAGE_CHOICES, default='en')
     preferred_theme = models.CharField(max_length=10, choices=THEME_CHOICES, default='light')
+    last_seen_notification_id = models.PositiveBigIntegerField(
+        default=0,
+        help_text="Notifications with an id up to this value are treated as read"
+    )
 
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
@@ -5,9 +5,8 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
-from django.core.mail import send_mail
-from django.conf import settings
 import random
+from core.mail import queue_email
 from .serializers import (
     UserSerializer,
     RegisterSerializer,
@@ -93,18 +92,12 @@ class PasswordResetRequestView(APIView):
                 print(f"Code will expire in 15 minutes")
                 print("="*80)
 
-                # Send email with reset code
-                try:
-                    send_mail(
-                        'Password Reset Code',
-                        f'Your password reset code is: {code}\n\nThis code will expire in 15 minutes.\n\nIf you did not request this code, please ignore this email.',
-                        settings.DEFAULT_FROM_EMAIL,
-                        [email],
-                        fail_silently=False,
-                    )
-                    print("Email sent successfully via console backend")
-                except Exception as e:
-                    print(f"Error sending email: {e}")
+                # Queue email with reset code (sent by send_queued_emails)
+                queue_email(
+                    'Password Reset Code',
+                    f'Your password reset code is: {code}\n\nThis code will expire in 15 minutes.\n\nIf you did not request this code, please ignore this email.',
+                    email
+                )
 
                 return Response({
                     "message": "Password reset code sent to your email"
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Confession, Post, PostMedia, Comment, Like, Subscription, Notification, PostView
+from .models import Confession, Post, PostMedia, Comment, Like, Subscription, Notification, PostView, FanoutJob, NotificationPreference, ConfessionSimilarity
 
 
 @admin.register(Confession)
@@ -16,7 +16,7 @@ class ConfessionAdmin(admin.ModelAdmin):
             'fields': ('name', 'slug', 'description', 'logo')
         }),
         ('Management', {
-            'fields': ('admin',)
+            'fields': ('admin', 'message_retention_days')
         }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
@@ -25,14 +25,12 @@ class ConfessionAdmin(admin.ModelAdmin):
     )
 
     def subscribers_count(self, obj):
-        count = obj.subscribers.count()
-        return format_html('<strong>{}</strong>', count)
+        return format_html('<strong>{}</strong>', obj.subscribers_count)
 
     subscribers_count.short_description = 'Subscribers'
 
     def posts_count(self, obj):
-        count = obj.posts.count()
-        return format_html('<strong>{}</strong>', count)
+        return format_html('<strong>{}</strong>', obj.posts_count)
 
     posts_count.short_description = 'Posts'
 
@@ -162,4 +160,29 @@ class PostViewAdmin(admin.ModelAdmin):
 
     def has_add_permission(self, request):
         # Prevent manual creation of views in admin
-        return False
\ No newline at end of file
+        return False
+
+
+@admin.register(FanoutJob)
+class FanoutJobAdmin(admin.ModelAdmin):
+    list_display = ['post', 'status', 'processed_count', 'last_subscription_id', 'created_at', 'finished_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['post__title']
+    raw_id_fields = ['post']
+    readonly_fields = ['locked_at', 'created_at', 'updated_at', 'finished_at']
+
+
+@admin.register(NotificationPreference)
+class NotificationPreferenceAdmin(admin.ModelAdmin):
+    list_display = ['user', 'muted_types', 'muted_confession_ids', 'digest_only', 'updated_at']
+    list_filter = ['digest_only']
+    search_fields = ['user__username']
+    raw_id_fields = ['user']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(ConfessionSimilarity)
+class ConfessionSimilarityAdmin(admin.ModelAdmin):
+    list_display = ['confession', 'rank', 'similar_confession', 'score', 'computed_at']
+    list_filter = ['confession']
+    readonly_fields = ['confession', 'similar_confession', 'score', 'rank', 'computed_at']
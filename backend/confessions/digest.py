@@ -0,0 +1,55 @@
+from datetime import timedelta
+from itertools import groupby
+
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import QueuedEmail
+from .models import Notification
+from .serializers import NotificationSerializer
+
+
+def iter_unread_digests(since):
+    """
+    Yield (recipient, notifications) for every user with unread notifications
+    created after `since`. Everything comes from one query ordered by recipient.
+    """
+    notifications = Notification.objects.filter(
+        created_at__gte=since,
+        is_read=False,
+        id__gt=F('recipient__last_seen_notification_id')
+    ).exclude(
+        recipient__email=''
+    ).select_related(
+        'recipient', 'actor', 'post'
+    ).order_by('recipient_id', '-created_at')
+
+    for _, group in groupby(notifications.iterator(chunk_size=2000), key=lambda n: n.recipient_id):
+        items = list(group)
+        yield items[0].recipient, items
+
+
+def build_digest_body(recipient, notifications, limit=20):
+    """Plain-text digest listing the newest notifications"""
+    serializer = NotificationSerializer()
+    lines = [f"Hello {recipient.username},", "", f"You have {len(notifications)} unread notifications:", ""]
+    for notification in notifications[:limit]:
+        lines.append(f"- {serializer.get_message(notification)}")
+    if len(notifications) > limit:
+        lines.append(f"...and {len(notifications) - limit} more.")
+    return '\n'.join(lines)
+
+
+def queue_notification_digests(hours=24):
+    """Queue one digest email per user; returns the number queued"""
+    since = timezone.now() - timedelta(hours=hours)
+    emails = [
+        QueuedEmail(
+            to_email=recipient.email,
+            subject='Your daily notification digest',
+            body=build_digest_body(recipient, notifications)
+        )
+        for recipient, notifications in iter_unread_digests(since)
+    ]
+    QueuedEmail.objects.bulk_create(emails, batch_size=500)
+    return len(emails)
@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import FanoutJob, Notification, Subscription
+from .notifications import load_notification_filters
+
+
+def process_fanout_job(job, batch_size=None):
+    """
+    Notify the subscribers of job.post in bounded batches.
+
+    Subscriptions are walked in id order and the cursor is saved together
+    with each batch, so an interrupted job resumes where it stopped without
+    duplicating notifications. The caller must hold the job's claim
+    (see claim_fanout_job).
+    """
+    batch_size = batch_size or settings.FANOUT_BATCH_SIZE
+    post = job.post
+
+    while True:
+        batch = list(
+            Subscription.objects.filter(
+                confession_id=post.confession_id,
+                id__gt=job.last_subscription_id
+            ).order_by('id').values_list('id', 'user_id')[:batch_size]
+        )
+        if not batch:
+            break
+
+        # Read preferences with the batch instead of the cache: the worker
+        # is a separate process and must see mutes immediately
+        filters = load_notification_filters(user_id for _, user_id in batch)
+        notifications = [
+            Notification(
+                recipient_id=user_id,
+                actor_id=post.author_id,
+                notification_type='new_post',
+                confession_id=post.confession_id,
+                post_id=post.id
+            )
+            for _, user_id in batch
+            if user_id != post.author_id
+            and filters[user_id].allows('new_post', post.confession_id)
+        ]
+
+        with transaction.atomic():
+            # Advance the cursor only while we still hold the lock; a job
+            # taken over after a stale lock is left to its new worker
+            now = timezone.now()
+            advanced = FanoutJob.objects.filter(pk=job.pk, locked_at=job.locked_at).update(
+                last_subscription_id=batch[-1][0],
+                processed_count=job.processed_count + len(batch),
+                locked_at=now,
+                updated_at=now
+            )
+            if not advanced:
+                return job
+            Notification.objects.bulk_create(notifications, batch_size=batch_size)
+        job.last_subscription_id = batch[-1][0]
+        job.processed_count += len(batch)
+        job.locked_at = now
+
+    now = timezone.now()
+    FanoutJob.objects.filter(pk=job.pk, locked_at=job.locked_at).update(
+        status='done', finished_at=now, locked_at=None, updated_at=now
+    )
+    job.status = 'done'
+    job.finished_at = now
+    job.locked_at = None
+    return job
+
+
+def claim_fanout_job(job):
+    """
+    Take ownership of job with one conditional UPDATE.
+    Only a pending job or a running job with a stale lock can be claimed,
+    so two workers never deliver the same job at once.
+    """
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=settings.FANOUT_LOCK_TIMEOUT)
+    claimed = FanoutJob.objects.filter(pk=job.pk).filter(
+        Q(status='pending') |
+        Q(status='running', locked_at__isnull=True) |
+        Q(status='running', locked_at__lt=stale_before)
+    ).update(status='running', locked_at=now, updated_at=now)
+    if not claimed:
+        return False
+    # Another worker may have advanced the cursor before its lock went stale
+    job.refresh_from_db(fields=['status', 'locked_at', 'last_subscription_id', 'processed_count'])
+    return True
+
+
+def process_pending_fanout_jobs(batch_size=None, limit=None):
+    """Run unfinished jobs oldest first; returns the number of jobs completed"""
+    jobs = FanoutJob.objects.filter(
+        status__in=['pending', 'running']
+    ).select_related('post').order_by('created_at')
+    if limit:
+        jobs = jobs[:limit]
+
+    completed = 0
+    for job in jobs:
+        if not claim_fanout_job(job):
+            continue
+        if process_fanout_job(job, batch_size=batch_size).status == 'done':
+            completed += 1
+    return completed
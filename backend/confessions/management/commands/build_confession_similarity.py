@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from confessions.recommendations import rebuild_confession_similarity
+
+
+class Command(BaseCommand):
+    help = 'Compute "people who follow X also follow Y" confession similarities'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=5, help='Neighbours stored per confession')
+
+    def handle(self, *args, **options):
+        stored = rebuild_confession_similarity(top_k=options['top_k'])
+        self.stdout.write(self.style.SUCCESS(f'Stored {stored} similarity row(s)'))
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from confessions.fanout import process_pending_fanout_jobs
+
+
+class Command(BaseCommand):
+    help = 'Deliver new-post notifications to confession subscribers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Subscriptions per batch')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new jobs')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            completed = process_pending_fanout_jobs(batch_size=options['batch_size'])
+            if completed:
+                self.stdout.write(self.style.SUCCESS(f'Completed {completed} fan-out job(s)'))
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from confessions.digest import queue_notification_digests
+
+
+class Command(BaseCommand):
+    help = 'Queue daily digest emails of unread notifications'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='Include notifications from the last N hours')
+
+    def handle(self, *args, **options):
+        queued = queue_notification_digests(hours=options['hours'])
+        self.stdout.write(self.style.SUCCESS(f'Queued {queued} digest email(s)'))
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.25 on 2026-10-19 05:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('confessions', '0006_postview'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comments_enabled',
+            field=models.BooleanField(default=True, help_text='Allow comments on this post'),
+        ),
+        migrations.CreateModel(
+            name='PostMedia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('media_type', models.CharField(choices=[('image', 'Image'), ('video', 'Video'), ('pdf', 'PDF')], max_length=10)),
+                ('file', models.FileField(upload_to='posts/media/%Y/%m/%d/')),
+                ('order', models.PositiveIntegerField(default=0, help_text='Display order for carousel')),
+                ('thumbnail', models.ImageField(blank=True, help_text='Thumbnail for videos', null=True, upload_to='posts/thumbnails/%Y/%m/%d/')),
+                ('duration', models.PositiveIntegerField(blank=True, help_text='Video duration in seconds', null=True)),
+                ('width', models.PositiveIntegerField(blank=True, null=True)),
+                ('height', models.PositiveIntegerField(blank=True, null=True)),
+                ('file_size', models.PositiveIntegerField(blank=True, help_text='File size in bytes', null=True)),
+                ('uploaded_at', models.DateTimeField(auto_now_add=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='media_files', to='confessions.post')),
+            ],
+            options={
+                'verbose_name': 'Post Media',
+                'verbose_name_plural': 'Post Media',
+                'ordering': ['order', 'id'],
+            },
+        ),
+    ]
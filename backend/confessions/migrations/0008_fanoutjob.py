@@ -0,0 +1,38 @@
+# Generated by Django 4.2.25 on 2026-10-19 05:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('confessions', '0007_post_comments_enabled_postmedia'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='notification_type',
+            field=models.CharField(choices=[('subscribe', 'Subscribe'), ('like', 'Like'), ('comment', 'Comment'), ('comment_like', 'Comment Like'), ('comment_reply', 'Comment Reply'), ('new_post', 'New Post')], max_length=20),
+        ),
+        migrations.CreateModel(
+            name='FanoutJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done')], default='pending', max_length=10)),
+                ('last_subscription_id', models.PositiveBigIntegerField(default=0, help_text='Subscriptions up to this id have already been notified')),
+                ('processed_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='fanout_job', to='confessions.post')),
+            ],
+            options={
+                'verbose_name': 'Fan-out Job',
+                'verbose_name_plural': 'Fan-out Jobs',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='confessions_status_365b32_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.25 on 2026-10-19 05:17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('confessions', '0008_fanoutjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationPreference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('muted_types', models.JSONField(blank=True, default=list, help_text='Notification types that are never created')),
+                ('muted_confession_ids', models.JSONField(blank=True, default=list, help_text='Confessions whose notifications are never created')),
+                ('digest_only', models.BooleanField(default=False, help_text='Skip the unread badge and rely on the email digest')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='notification_preference', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Notification Preference',
+                'verbose_name_plural': 'Notification Preferences',
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.25 on 2026-10-19 05:18
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_counters(apps, schema_editor):
+    Confession = apps.get_model('confessions', 'Confession')
+    confessions = Confession.objects.annotate(
+        subscriber_total=Count('subscribers', distinct=True),
+        post_total=Count('posts', distinct=True)
+    )
+    for confession in confessions:
+        Confession.objects.filter(pk=confession.pk).update(
+            subscribers_count=confession.subscriber_total,
+            posts_count=confession.post_total
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('confessions', '0009_notificationpreference'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='confession',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='confession',
+            name='subscribers_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
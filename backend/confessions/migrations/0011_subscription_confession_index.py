@@ -0,0 +1,17 @@
+# Generated by Django 4.2.25 on 2026-10-19 05:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('confessions', '0010_confession_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['confession', '-subscribed_at'], name='confessions_confess_87c46e_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.25 on 2026-10-19 05:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('confessions', '0011_subscription_confession_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConfessionSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text='Cosine similarity of the subscriber sets')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('computed_at', models.DateTimeField(auto_now_add=True)),
+                ('confession', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_confessions', to='confessions.confession')),
+                ('similar_confession', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='confessions.confession')),
+            ],
+            options={
+                'verbose_name': 'Confession Similarity',
+                'verbose_name_plural': 'Confession Similarities',
+                'ordering': ['confession', 'rank'],
+                'unique_together': {('confession', 'rank')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.25 on 2026-10-19 05:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('confessions', '0012_confessionsimilarity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='confession',
+            name='message_retention_days',
+            field=models.PositiveIntegerField(blank=True, help_text='Delete chat messages older than this many days (empty = keep forever)', null=True),
+        ),
+    ]
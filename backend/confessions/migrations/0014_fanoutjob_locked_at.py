@@ -0,0 +1,18 @@
+# Generated by Django 4.2.25 on 2026-10-19 05:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('confessions', '0013_confession_message_retention_days'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fanoutjob',
+            name='locked_at',
+            field=models.DateTimeField(blank=True, help_text='Set by the worker that claimed the job; refreshed after every batch', null=True),
+        ),
+    ]
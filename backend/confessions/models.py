@@ -17,12 +17,31 @@ class Confession(models.Model):
         related_name='managed_confessions',
         limit_choices_to={'role__in': ['admin', 'superadmin']}
     )
+    message_retention_days = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Delete chat messages older than this many days (empty = keep forever)"
+    )
+    subscribers_count = models.PositiveIntegerField(default=0, editable=False)
+    posts_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Maintained with F() updates by confessions.signals
+    COUNTER_FIELDS = ('subscribers_count', 'posts_count')
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Never write back possibly stale in-memory counter values
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['name']
         verbose_name = 'Confession'
@@ -38,6 +57,9 @@ class Subscription(models.Model):
     class Meta:
         unique_together = ['user', 'confession']
         ordering = ['-subscribed_at']
+        indexes = [
+            models.Index(fields=['confession', '-subscribed_at']),
+        ]
 
     def __str__(self):
         return f"{self.user.username} -> {self.confession.name}"
@@ -205,6 +227,7 @@ class Notification(models.Model):
         ('comment', 'Comment'),
         ('comment_like', 'Comment Like'),
         ('comment_reply', 'Comment Reply'),
+        ('new_post', 'New Post'),
     )
 
     recipient = models.ForeignKey(
@@ -257,4 +280,76 @@ class Notification(models.Model):
         indexes = [
             models.Index(fields=['recipient', '-created_at']),
             models.Index(fields=['recipient', 'is_read']),
-        ]
\ No newline at end of file
+        ]
+
+
+class FanoutJob(models.Model):
+    """Deferred delivery of new-post notifications to confession subscribers"""
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+    )
+
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, related_name='fanout_job')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    last_subscription_id = models.PositiveBigIntegerField(
+        default=0,
+        help_text="Subscriptions up to this id have already been notified"
+    )
+    processed_count = models.PositiveIntegerField(default=0)
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Set by the worker that claimed the job; refreshed after every batch"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Fan-out for post #{self.post_id} ({self.status})"
+
+    class Meta:
+        ordering = ['created_at']
+        verbose_name = 'Fan-out Job'
+        verbose_name_plural = 'Fan-out Jobs'
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+
+
+class NotificationPreference(models.Model):
+    """Per-user notification filters, checked before a Notification is written"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='notification_preference')
+    muted_types = models.JSONField(default=list, blank=True, help_text="Notification types that are never created")
+    muted_confession_ids = models.JSONField(default=list, blank=True, help_text="Confessions whose notifications are never created")
+    digest_only = models.BooleanField(default=False, help_text="Skip the unread badge and rely on the email digest")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Notification preferences of {self.user.username}"
+
+    class Meta:
+        verbose_name = 'Notification Preference'
+        verbose_name_plural = 'Notification Preferences'
+
+
+
+class ConfessionSimilarity(models.Model):
+    """Top-k co-subscription neighbours of a confession (build_confession_similarity)"""
+    confession = models.ForeignKey(Confession, on_delete=models.CASCADE, related_name='similar_confessions')
+    similar_confession = models.ForeignKey(Confession, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField(help_text="Cosine similarity of the subscriber sets")
+    rank = models.PositiveSmallIntegerField()
+    computed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.confession_id} ~ {self.similar_confession_id} ({self.score:.3f})"
+
+    class Meta:
+        ordering = ['confession', 'rank']
+        unique_together = ['confession', 'rank']
+        verbose_name = 'Confession Similarity'
+        verbose_name_plural = 'Confession Similarities'
@@ -0,0 +1,82 @@
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Notification, NotificationPreference
+
+PREFERENCE_CACHE_KEY = 'notification_prefs_{}'
+
+
+class NotificationFilter(namedtuple('NotificationFilter', ['muted_types', 'muted_confession_ids', 'digest_only'])):
+    """Compact, cacheable view of a user's NotificationPreference"""
+
+    def allows(self, notification_type, confession_id=None):
+        if notification_type in self.muted_types:
+            return False
+        return confession_id is None or confession_id not in self.muted_confession_ids
+
+
+DEFAULT_FILTER = NotificationFilter(frozenset(), frozenset(), False)
+
+
+def _to_filter(preference):
+    return NotificationFilter(
+        frozenset(preference.muted_types),
+        frozenset(preference.muted_confession_ids),
+        preference.digest_only
+    )
+
+
+def load_notification_filters(user_ids):
+    """Return {user_id: NotificationFilter} straight from the database in one query"""
+    user_ids = set(user_ids)
+    loaded = {
+        preference.user_id: _to_filter(preference)
+        for preference in NotificationPreference.objects.filter(user_id__in=user_ids)
+    }
+    return {user_id: loaded.get(user_id, DEFAULT_FILTER) for user_id in user_ids}
+
+
+def get_notification_filters(user_ids):
+    """
+    Return {user_id: NotificationFilter}, loading cache misses in one query.
+    Entries expire after NOTIFICATION_PREFERENCE_CACHE_TIMEOUT, so processes
+    that missed an invalidation converge quickly.
+    """
+    user_ids = set(user_ids)
+    keys = {PREFERENCE_CACHE_KEY.format(user_id): user_id for user_id in user_ids}
+    filters = {keys[key]: value for key, value in cache.get_many(keys).items()}
+
+    missing = user_ids - filters.keys()
+    if missing:
+        loaded = load_notification_filters(missing)
+        filters.update(loaded)
+        cache.set_many(
+            {PREFERENCE_CACHE_KEY.format(user_id): value for user_id, value in loaded.items()},
+            settings.NOTIFICATION_PREFERENCE_CACHE_TIMEOUT
+        )
+    return filters
+
+
+def get_notification_filter(user_id):
+    return get_notification_filters([user_id])[user_id]
+
+
+def invalidate_notification_filter(user_id):
+    cache.delete(PREFERENCE_CACHE_KEY.format(user_id))
+
+
+def create_notification(recipient_id, actor_id, notification_type, confession_id=None, post_id=None, comment_id=None):
+    """Create a notification unless the recipient has muted it; returns None when skipped"""
+    if not get_notification_filter(recipient_id).allows(notification_type, confession_id):
+        return None
+
+    return Notification.objects.create(
+        recipient_id=recipient_id,
+        actor_id=actor_id,
+        notification_type=notification_type,
+        confession_id=confession_id,
+        post_id=post_id,
+        comment_id=comment_id
+    )
@@ -1,5 +1,7 @@
 from rest_framework import permissions
 
+from .registry import is_confession_admin
+
 
 class IsConfessionAdminOrReadOnly(permissions.BasePermission):
     """
@@ -20,8 +22,8 @@ class IsConfessionAdminOrReadOnly(permissions.BasePermission):
             return True
 
         # Admin faqat o'z konfessiyasiga tegishli postlarni boshqaradi
-        if hasattr(obj, 'confession'):
-            return obj.confession.admin == request.user
+        if hasattr(obj, 'confession_id'):
+            return is_confession_admin(request.user, obj.confession_id)
 
         return False
 
@@ -36,11 +38,11 @@ class IsCommentAuthorOrReadOnly(permissions.BasePermission):
             return True
 
         # Komment muallifi
-        if obj.author == request.user:
+        if obj.author_id == request.user.id:
             return True
 
         # Konfessiya admini
-        if obj.post.confession.admin == request.user:
+        if is_confession_admin(request.user, obj.post.confession_id):
             return True
 
         # SuperAdmin
@@ -79,6 +81,6 @@ class IsConfessionAdminOrSuperAdmin(permissions.BasePermission):
 
         # Konfessiya admini o'z konfessiyasini tahrirlashi mumkin (delete qila olmaydi)
         if request.method in ['PUT', 'PATCH']:
-            return obj.admin == request.user
+            return obj.admin_id == request.user.id
 
         return False
\ No newline at end of file
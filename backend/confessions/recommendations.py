@@ -0,0 +1,79 @@
+import numpy as np
+from django.db import transaction
+
+from .models import Confession, ConfessionSimilarity, Subscription
+
+
+def build_cosubscription_matrix(confession_ids, user_chunk=5000):
+    """
+    Confession x confession co-subscription counts, i.e. X.T @ X for the
+    sparse user x confession matrix X. Subscriptions are streamed in user
+    order and each block of users is multiplied as a small dense matrix.
+    """
+    column = {confession_id: index for index, confession_id in enumerate(confession_ids)}
+    size = len(confession_ids)
+    cooccurrence = np.zeros((size, size), dtype=np.float64)
+
+    rows = Subscription.objects.order_by('user_id').values_list('user_id', 'confession_id')
+    user_indexes, confession_indexes = [], []
+    current_user, user_count = None, 0
+
+    def flush():
+        if not user_indexes:
+            return
+        block = np.zeros((user_count, size), dtype=np.float32)
+        block[user_indexes, confession_indexes] = 1.0
+        cooccurrence[:] += block.T @ block
+        user_indexes.clear()
+        confession_indexes.clear()
+
+    for user_id, confession_id in rows.iterator(chunk_size=user_chunk):
+        if user_id != current_user:
+            if user_count == user_chunk:
+                flush()
+                user_count = 0
+            current_user = user_id
+            user_count += 1
+        user_indexes.append(user_count - 1)
+        confession_indexes.append(column[confession_id])
+
+    flush()
+    return cooccurrence
+
+
+def cosine_top_k(cooccurrence, top_k):
+    """Return (indexes, scores) of the top_k most similar columns per row"""
+    norms = np.sqrt(np.diag(cooccurrence))
+    denominator = np.outer(norms, norms)
+    similarity = np.divide(cooccurrence, denominator, out=np.zeros_like(cooccurrence), where=denominator > 0)
+    np.fill_diagonal(similarity, 0.0)
+
+    top_k = min(top_k, max(similarity.shape[0] - 1, 0))
+    indexes = np.argsort(-similarity, axis=1, kind='stable')[:, :top_k]
+    scores = np.take_along_axis(similarity, indexes, axis=1)
+    return indexes, scores
+
+
+def rebuild_confession_similarity(top_k=5):
+    """Recompute and store the top_k neighbours of every confession"""
+    confession_ids = list(Confession.objects.order_by('id').values_list('id', flat=True))
+    if not confession_ids:
+        return 0
+
+    indexes, scores = cosine_top_k(build_cosubscription_matrix(confession_ids), top_k)
+    similarities = [
+        ConfessionSimilarity(
+            confession_id=confession_ids[row],
+            similar_confession_id=confession_ids[index],
+            score=float(score),
+            rank=rank
+        )
+        for row in range(len(confession_ids))
+        for rank, (index, score) in enumerate(zip(indexes[row], scores[row]))
+        if score > 0
+    ]
+
+    with transaction.atomic():
+        ConfessionSimilarity.objects.all().delete()
+        ConfessionSimilarity.objects.bulk_create(similarities)
+    return len(similarities)
@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Confession
+
+REGISTRY_VERSION_KEY = 'confession_registry_version'
+
+ConfessionEntry = namedtuple('ConfessionEntry', ['id', 'slug', 'name', 'logo', 'admin_id'])
+
+# Per-process copy of the catalog, reloaded when the shared version moves
+# or after CONFESSION_REGISTRY_MAX_AGE seconds, whichever comes first. The
+# age limit bounds staleness when the cache is not shared between processes.
+_lock = threading.Lock()
+_state = {'version': None, 'loaded_at': 0.0, 'by_id': {}, 'by_slug': {}}
+
+
+def _bump():
+    try:
+        cache.incr(REGISTRY_VERSION_KEY)
+    except ValueError:
+        cache.set(REGISTRY_VERSION_KEY, time.time_ns(), None)
+
+
+def bump_registry_version():
+    """Move the version once the current transaction commits, so no reader reloads the old catalog under it"""
+    transaction.on_commit(_bump)
+
+
+def _current_version():
+    version = cache.get(REGISTRY_VERSION_KEY)
+    if version is None:
+        cache.add(REGISTRY_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(REGISTRY_VERSION_KEY)
+    return version
+
+
+def _is_fresh(version):
+    return (
+        _state['version'] == version
+        and time.monotonic() - _state['loaded_at'] < settings.CONFESSION_REGISTRY_MAX_AGE
+    )
+
+
+def _entries():
+    version = _current_version()
+    if not _is_fresh(version):
+        with _lock:
+            if not _is_fresh(version):
+                by_id = {
+                    row[0]: ConfessionEntry(*row)
+                    for row in Confession.objects.values_list('id', 'slug', 'name', 'logo', 'admin_id')
+                }
+                _state.update(
+                    by_id=by_id,
+                    by_slug={entry.slug: entry for entry in by_id.values()},
+                    version=version,
+                    loaded_at=time.monotonic()
+                )
+    return _state
+
+
+def get_confession(confession_id):
+    try:
+        confession_id = int(confession_id)
+    except (TypeError, ValueError):
+        return None
+    return _entries()['by_id'].get(confession_id)
+
+
+def get_confession_by_slug(slug):
+    return _entries()['by_slug'].get(slug)
+
+
+def get_admin_id(confession_id):
+    entry = get_confession(confession_id)
+    return entry.admin_id if entry else None
+
+
+def is_confession_admin(user, confession_id):
+    """True when the user administers the confession (ids only, no queries)"""
+    return bool(user and user.is_authenticated and confession_id) and get_admin_id(confession_id) == user.id
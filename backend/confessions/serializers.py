@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import Confession, Post, PostMedia, Like, Comment, Subscription, Notification, CommentLike
+from .registry import is_confession_admin
+from .utils import get_subscribed_confession_ids
+from .models import Confession, Post, PostMedia, Like, Comment, Subscription, Notification, CommentLike, NotificationPreference
 
 User = get_user_model()
 
@@ -15,8 +17,8 @@ class UserMinimalSerializer(serializers.ModelSerializer):
 
 class ConfessionSerializer(serializers.ModelSerializer):
     admin = UserMinimalSerializer(read_only=True)
-    subscribers_count = serializers.SerializerMethodField()
-    posts_count = serializers.SerializerMethodField()
+    subscribers_count = serializers.ReadOnlyField()
+    posts_count = serializers.ReadOnlyField()
     is_subscribed = serializers.SerializerMethodField()
 
     class Meta:
@@ -24,20 +26,11 @@ class ConfessionSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'slug', 'description', 'logo',
             'admin', 'subscribers_count', 'posts_count',
-            'is_subscribed', 'created_at'
+            'message_retention_days', 'is_subscribed', 'created_at'
         ]
 
-    def get_subscribers_count(self, obj):
-        return obj.subscribers.count()
-
-    def get_posts_count(self, obj):
-        return obj.posts.count()
-
     def get_is_subscribed(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return Subscription.objects.filter(user=request.user, confession=obj).exists()
-        return False
+        return obj.id in get_subscribed_confession_ids(self.context.get('request'))
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -165,7 +158,7 @@ class PostCreateSerializer(serializers.ModelSerializer):
         """Faqat o'z konfessiyasiga post qo'shish mumkin"""
         request = self.context.get('request')
         if request.user.role == 'admin':
-            if not value.admin == request.user:
+            if not is_confession_admin(request.user, value.id):
                 raise serializers.ValidationError("You can only post to your managed confession.")
         return value
 
@@ -206,6 +199,15 @@ class SubscriptionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'subscribed_at']
 
 
+class BulkSubscriptionSerializer(serializers.Serializer):
+    """Request body of bulk_subscribe / bulk_unsubscribe"""
+    slugs = serializers.ListField(
+        child=serializers.SlugField(max_length=100),
+        allow_empty=False,
+        max_length=50
+    )
+
+
 class NotificationSerializer(serializers.ModelSerializer):
     """Notification serializer for confession admins"""
     actor = UserMinimalSerializer(read_only=True)
@@ -213,6 +215,7 @@ class NotificationSerializer(serializers.ModelSerializer):
     post = serializers.SerializerMethodField()
     message = serializers.SerializerMethodField()
     link = serializers.SerializerMethodField()
+    is_read = serializers.SerializerMethodField()
     time_ago = serializers.SerializerMethodField()
 
     class Meta:
@@ -260,6 +263,9 @@ class NotificationSerializer(serializers.ModelSerializer):
         elif obj.notification_type == 'comment_reply':
             post_title = obj.post.title if obj.post else 'a post'
             return f"@{actor_username} replied to your comment on '{post_title}'."
+        elif obj.notification_type == 'new_post':
+            post_title = obj.post.title if obj.post else 'a new post'
+            return f"@{actor_username} published '{post_title}'."
 
         return f"@{actor_username} interacted with your confession."
 
@@ -278,7 +284,46 @@ class NotificationSerializer(serializers.ModelSerializer):
         # Fallback to home if no valid link can be generated
         return "/"
 
+    def get_is_read(self, obj):
+        """Read if flagged individually or covered by the recipient's watermark"""
+        if obj.is_read:
+            return True
+        watermark = self.context.get('last_seen_notification_id')
+        if watermark is None:
+            request = self.context.get('request')
+            if request and request.user.is_authenticated:
+                watermark = request.user.last_seen_notification_id
+        return obj.id <= (watermark or 0)
+
     def get_time_ago(self, obj):
         """Calculate human-readable time difference"""
         from django.utils.timesince import timesince
-        return timesince(obj.created_at) + " ago"
\ No newline at end of file
+        return timesince(obj.created_at) + " ago"
+
+
+class NotificationPreferenceSerializer(serializers.ModelSerializer):
+    """Mute settings applied when notifications are created"""
+    muted_types = serializers.ListField(
+        child=serializers.ChoiceField(choices=Notification.NOTIFICATION_TYPES),
+        required=False
+    )
+    muted_confession_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False
+    )
+
+    class Meta:
+        model = NotificationPreference
+        fields = ['muted_types', 'muted_confession_ids', 'digest_only', 'updated_at']
+        read_only_fields = ['updated_at']
+
+    def validate_muted_types(self, value):
+        return sorted(set(value))
+
+    def validate_muted_confession_ids(self, value):
+        value = sorted(set(value))
+        existing = set(Confession.objects.filter(id__in=value).values_list('id', flat=True))
+        unknown = [confession_id for confession_id in value if confession_id not in existing]
+        if unknown:
+            raise serializers.ValidationError(f"Unknown confession ids: {unknown}")
+        return value
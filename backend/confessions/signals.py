@@ -1,18 +1,23 @@
-from django.db.models.signals import post_save, pre_delete
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete, pre_save, pre_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import Post, Confession
+from .models import Post, Confession, Subscription, FanoutJob, NotificationPreference
+from .notifications import invalidate_notification_filter
+from .registry import bump_registry_version
+from .utils import invalidate_user_subscriptions
 
 User = get_user_model()
 
 @receiver(post_save, sender=Post)
 def notify_subscribers(sender, instance, created, **kwargs):
     """
-    Yangi post joylanganda obunachilarga bildirishnoma (keyinchalik)
+    Yangi post joylanganda obunachilarga bildirishnoma.
+    Only a job row is written here; run_fanout delivers it in batches.
     """
     if created:
-        # Bu yerda bildirishnoma yuborish logikasi bo'lishi mumkin
-        print(f"New post created: {instance.title} in {instance.confession.name}")
+        FanoutJob.objects.create(post=instance)
 
 
 @receiver(pre_delete, sender=Confession)
@@ -21,4 +26,55 @@ def prevent_confession_deletion_if_has_posts(sender, instance, **kwargs):
     Agar konfessiyada postlar bo'lsa, o'chirmaslik (ixtiyoriy)
     """
     if instance.posts.exists():
-        raise ValueError(f"Cannot delete {instance.name} - it has posts!")
\ No newline at end of file
+        raise ValueError(f"Cannot delete {instance.name} - it has posts!")
+
+
+@receiver([post_save, post_delete], sender=NotificationPreference)
+def invalidate_notification_preference(sender, instance, **kwargs):
+    """Drop the cached filter once the change is committed, so no reader re-caches the old row"""
+    transaction.on_commit(lambda: invalidate_notification_filter(instance.user_id))
+
+
+@receiver([post_save, post_delete], sender=Confession)
+def refresh_confession_registry(sender, instance, **kwargs):
+    """Make every process reload its confession registry"""
+    bump_registry_version()
+
+
+def _bump_counter(confession_id, field, delta):
+    Confession.objects.filter(pk=confession_id).update(**{field: F(field) + delta})
+
+
+@receiver(post_save, sender=Subscription)
+def increment_subscribers_count(sender, instance, created, **kwargs):
+    if created:
+        _bump_counter(instance.confession_id, 'subscribers_count', 1)
+        transaction.on_commit(lambda: invalidate_user_subscriptions(instance.user_id))
+
+
+@receiver(post_delete, sender=Subscription)
+def decrement_subscribers_count(sender, instance, **kwargs):
+    _bump_counter(instance.confession_id, 'subscribers_count', -1)
+    transaction.on_commit(lambda: invalidate_user_subscriptions(instance.user_id))
+
+
+@receiver(pre_save, sender=Post)
+def move_posts_count(sender, instance, update_fields=None, **kwargs):
+    """Keep posts_count right when a post is moved to another confession"""
+    if instance._state.adding or (update_fields is not None and 'confession' not in update_fields):
+        return
+    old_confession_id = Post.objects.filter(pk=instance.pk).values_list('confession_id', flat=True).first()
+    if old_confession_id and old_confession_id != instance.confession_id:
+        _bump_counter(old_confession_id, 'posts_count', -1)
+        _bump_counter(instance.confession_id, 'posts_count', 1)
+
+
+@receiver(post_save, sender=Post)
+def increment_posts_count(sender, instance, created, **kwargs):
+    if created:
+        _bump_counter(instance.confession_id, 'posts_count', 1)
+
+
+@receiver(post_delete, sender=Post)
+def decrement_posts_count(sender, instance, **kwargs):
+    _bump_counter(instance.confession_id, 'posts_count', -1)
@@ -0,0 +1,59 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Subscription
+
+SUBSCRIPTION_VERSION_KEY = 'subscriptions_version_{}'
+SUBSCRIPTION_CACHE_KEY = 'subscriptions_{}_v{}'
+
+
+def _subscription_version(user_id):
+    key = SUBSCRIPTION_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        # A timestamp never collides with a version that was evicted earlier
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_user_subscriptions(user_id):
+    """
+    Bump the user's version so every cached subscription set goes stale.
+    Call it after commit (transaction.on_commit): bumping earlier lets a
+    concurrent read cache the old set under the new version.
+    """
+    key = SUBSCRIPTION_VERSION_KEY.format(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def get_user_subscription_ids(user_id):
+    """Cached frozenset of confession ids the user follows"""
+    key = SUBSCRIPTION_CACHE_KEY.format(user_id, _subscription_version(user_id))
+    subscribed = cache.get(key)
+    if subscribed is None:
+        subscribed = frozenset(
+            Subscription.objects.filter(user_id=user_id).values_list('confession_id', flat=True)
+        )
+        cache.set(key, subscribed, settings.SUBSCRIPTION_CACHE_TIMEOUT)
+    return subscribed
+
+
+def get_subscribed_confession_ids(request):
+    """
+    Same set as get_user_subscription_ids, memoized on the request so the
+    cache is hit once per request.
+    """
+    if not request or not request.user.is_authenticated:
+        return frozenset()
+
+    subscribed = getattr(request, '_subscribed_confession_ids', None)
+    if subscribed is None:
+        subscribed = get_user_subscription_ids(request.user.id)
+        request._subscribed_confession_ids = subscribed
+    return subscribed
@@ -1,25 +1,42 @@
+import json
+
+from asgiref.sync import sync_to_async
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
-
-from core.pagination import StandardResultsSetPagination
-from .models import Confession, Post, Comment, Like, Subscription, Notification, CommentLike, PostView
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.core.files.storage import default_storage
+from django.http import StreamingHttpResponse
+
+from core.pagination import StandardResultsSetPagination, KeysetPagination
+from .models import Confession, Post, Comment, Like, Subscription, Notification, CommentLike, PostView, NotificationPreference, ConfessionSimilarity
 from .serializers import (
     ConfessionSerializer, PostSerializer, PostCreateSerializer,
-    CommentSerializer, CommentReplySerializer, SubscriptionSerializer, UserMinimalSerializer,
-    NotificationSerializer
+    CommentSerializer, CommentReplySerializer, SubscriptionSerializer,
+    BulkSubscriptionSerializer, NotificationSerializer, NotificationPreferenceSerializer
 )
+from .utils import get_subscribed_confession_ids, invalidate_user_subscriptions
+from .registry import get_admin_id, get_confession_by_slug, is_confession_admin
+from .notifications import create_notification, get_notification_filter, get_notification_filters
 from .permissions import IsConfessionAdminOrReadOnly, IsCommentAuthorOrReadOnly, IsSuperAdminOnly, IsConfessionAdminOrSuperAdmin
 
 
+class FollowersPagination(KeysetPagination):
+    ordering_field = 'subscribed_at'
+    page_size = 50
+
+
 class ConfessionViewSet(viewsets.ModelViewSet):
     """
     Konfessiyalar CRUD
     """
-    queryset = Confession.objects.all()
+    queryset = Confession.objects.select_related('admin')
     serializer_class = ConfessionSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = 'slug'
@@ -27,6 +44,7 @@ class ConfessionViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'description']
     ordering_fields = ['name', 'created_at']
     pagination_class = StandardResultsSetPagination
+    export_batch_size = 2000
 
     def get_permissions(self):
         if self.action in ['create', 'destroy']:
@@ -45,12 +63,13 @@ class ConfessionViewSet(viewsets.ModelViewSet):
         )
         if created:
             # Create notification for confession admin
-            if confession.admin and confession.admin != request.user:
-                Notification.objects.create(
-                    recipient=confession.admin,
-                    actor=request.user,
+            admin_id = get_admin_id(confession.id)
+            if admin_id and admin_id != request.user.id:
+                create_notification(
+                    recipient_id=admin_id,
+                    actor_id=request.user.id,
                     notification_type='subscribe',
-                    confession=confession
+                    confession_id=confession.id
                 )
             return Response({'message': 'Subscribed successfully'}, status=status.HTTP_201_CREATED)
         return Response({'message': 'Already subscribed'}, status=status.HTTP_200_OK)
@@ -66,7 +85,7 @@ class ConfessionViewSet(viewsets.ModelViewSet):
         if deleted:
             # Delete subscribe notification (like unlike does)
             Notification.objects.filter(
-                recipient=confession.admin,
+                recipient_id=get_admin_id(confession.id),
                 actor=request.user,
                 notification_type='subscribe',
                 confession=confession
@@ -74,6 +93,149 @@ class ConfessionViewSet(viewsets.ModelViewSet):
             return Response({'message': 'Unsubscribed successfully'}, status=status.HTTP_200_OK)
         return Response({'message': 'Not subscribed'}, status=status.HTTP_400_BAD_REQUEST)
 
+    def _resolve_slugs(self, request):
+        """Map request.data['slugs'] to registry entries; returns (entries, error_response)"""
+        serializer = BulkSubscriptionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return None, Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        slugs = serializer.validated_data['slugs']
+        entries = {slug: get_confession_by_slug(slug) for slug in dict.fromkeys(slugs)}
+        unknown = [slug for slug, entry in entries.items() if entry is None]
+        if unknown:
+            return None, Response({'error': 'Unknown confessions', 'unknown': unknown}, status=status.HTTP_400_BAD_REQUEST)
+        return list(entries.values()), None
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    def bulk_subscribe(self, request):
+        """Subscribe to several confessions in one transaction (onboarding)"""
+        entries, error = self._resolve_slugs(request)
+        if error:
+            return error
+
+        user = request.user
+        confession_ids = [entry.id for entry in entries]
+        user_subscriptions = Subscription.objects.filter(user=user, confession_id__in=confession_ids)
+        with transaction.atomic():
+            before = dict(user_subscriptions.values_list('id', 'confession_id'))
+            existing = set(before.values())
+            candidates = [Subscription(user=user, confession_id=confession_id)
+                          for confession_id in confession_ids if confession_id not in existing]
+            # A concurrent request may insert the same rows; ignore_conflicts
+            # skips them, and they are told apart below
+            Subscription.objects.bulk_create(candidates, ignore_conflicts=True)
+
+            # Rows that appeared since the first read are ours only if they
+            # carry the subscribed_at stamped on our own objects
+            stamps = {candidate.confession_id: candidate.subscribed_at for candidate in candidates}
+            inserted = {
+                confession_id
+                for confession_id, subscribed_at in user_subscriptions.exclude(
+                    id__in=before
+                ).values_list('confession_id', 'subscribed_at')
+                if stamps.get(confession_id) == subscribed_at
+            }
+            new_entries = [entry for entry in entries if entry.id in inserted]
+
+            # bulk_create skips the signals that maintain counters; recount
+            # instead of incrementing so racing requests can't double-count
+            Confession.objects.filter(id__in=inserted).update(subscribers_count=Coalesce(
+                Subquery(
+                    Subscription.objects.filter(confession_id=OuterRef('pk')).values(
+                        'confession_id'
+                    ).annotate(total=Count('id')).values('total')
+                ),
+                0
+            ))
+
+            admin_entries = [entry for entry in new_entries if entry.admin_id and entry.admin_id != user.id]
+            filters = get_notification_filters(entry.admin_id for entry in admin_entries)
+            Notification.objects.bulk_create([
+                Notification(
+                    recipient_id=entry.admin_id,
+                    actor_id=user.id,
+                    notification_type='subscribe',
+                    confession_id=entry.id
+                )
+                for entry in admin_entries
+                if filters[entry.admin_id].allows('subscribe', entry.id)
+            ])
+            transaction.on_commit(lambda: invalidate_user_subscriptions(user.id))
+
+        return Response({
+            'subscribed': [entry.slug for entry in new_entries],
+            'already_subscribed': [entry.slug for entry in entries if entry.id not in inserted]
+        }, status=status.HTTP_201_CREATED if new_entries else status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    def bulk_unsubscribe(self, request):
+        """Unsubscribe from several confessions in one transaction"""
+        entries, error = self._resolve_slugs(request)
+        if error:
+            return error
+
+        confession_ids = [entry.id for entry in entries]
+        with transaction.atomic():
+            # Per-row delete signals keep the counters and the cached set in sync
+            subscriptions = Subscription.objects.filter(user=request.user, confession_id__in=confession_ids)
+            removed = set(subscriptions.values_list('confession_id', flat=True))
+            subscriptions.delete()
+            Notification.objects.filter(
+                actor=request.user,
+                notification_type='subscribe',
+                confession_id__in=removed
+            ).delete()
+
+        return Response({
+            'unsubscribed': [entry.slug for entry in entries if entry.id in removed],
+            'not_subscribed': [entry.slug for entry in entries if entry.id not in removed]
+        }, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'])
+    def similar(self, request, slug=None):
+        """Confessions whose followers also follow this one"""
+        entry = get_confession_by_slug(slug)
+        if entry is None:
+            return Response({'error': 'Confession not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        similarities = ConfessionSimilarity.objects.filter(
+            confession_id=entry.id
+        ).select_related('similar_confession', 'similar_confession__admin').order_by('rank')
+        return Response([
+            dict(
+                ConfessionSerializer(similarity.similar_confession, context={'request': request}).data,
+                score=similarity.score
+            )
+            for similarity in similarities
+        ])
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def suggested(self, request):
+        """Personal suggestions built from the neighbours of followed confessions"""
+        subscribed = get_subscribed_confession_ids(request)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 5)), 1), 20)
+        except ValueError:
+            limit = 5
+
+        scores = {}
+        rows = ConfessionSimilarity.objects.filter(
+            confession_id__in=subscribed
+        ).exclude(similar_confession_id__in=subscribed).values_list('similar_confession_id', 'score')
+        for confession_id, score in rows:
+            scores[confession_id] = scores.get(confession_id, 0.0) + score
+
+        top_ids = sorted(scores, key=scores.get, reverse=True)[:limit]
+        confessions = Confession.objects.select_related('admin').in_bulk(top_ids)
+        return Response([
+            dict(
+                ConfessionSerializer(confessions[confession_id], context={'request': request}).data,
+                score=scores[confession_id]
+            )
+            for confession_id in top_ids
+            if confession_id in confessions
+        ])
+
     @action(detail=True, methods=['post'], permission_classes=[IsSuperAdminOnly])
     def assign_admin(self, request, slug=None):
         """Konfessiyaga admin tayinlash (faqat super admin)"""
@@ -103,19 +265,70 @@ class ConfessionViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['get'])
     def followers(self, request, slug=None):
-        """Konfessiya obunachilari ro'yxati"""
+        """Konfessiya obunachilari ro'yxati (cursor pagination, newest first)"""
         confession = self.get_object()
-        subscriptions = Subscription.objects.filter(confession=confession).select_related('user')
-        followers = [subscription.user for subscription in subscriptions]
-        serializer = UserMinimalSerializer(followers, many=True)
-        return Response(serializer.data)
+        subscriptions = Subscription.objects.filter(confession=confession).values(
+            'id', 'subscribed_at', 'user_id', 'user__username', 'user__avatar'
+        )
+        paginator = FollowersPagination()
+        page = paginator.paginate_queryset(subscriptions, request, view=self)
+        return paginator.get_paginated_response([
+            {
+                'id': row['user_id'],
+                'username': row['user__username'],
+                'avatar': default_storage.url(row['user__avatar']) if row['user__avatar'] else None,
+            }
+            for row in page
+        ])
+
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
+    def export_followers(self, request, slug=None):
+        """Stream all followers as NDJSON (confession admin or superadmin)"""
+        confession = self.get_object()
+        if not is_confession_admin(request.user, confession.id) and request.user.role != 'superadmin':
+            return Response({'error': 'Only the confession admin can export followers'}, status=status.HTTP_403_FORBIDDEN)
+
+        subscriptions = Subscription.objects.filter(confession=confession)
+
+        def fetch_batch(position):
+            batch = subscriptions
+            if position is not None:
+                subscribed_at, pk = position
+                batch = batch.filter(
+                    Q(subscribed_at__lt=subscribed_at) | Q(subscribed_at=subscribed_at, id__lt=pk)
+                )
+            return list(batch.order_by('-subscribed_at', '-id').values_list(
+                'id', 'user_id', 'user__username', 'subscribed_at'
+            )[:self.export_batch_size])
+
+        # Async so daphne streams each batch as it is read instead of
+        # collecting a sync iterator in memory first
+        async def generate():
+            position = None
+            while True:
+                batch = await sync_to_async(fetch_batch)(position)
+                if not batch:
+                    break
+                yield ''.join(
+                    json.dumps({
+                        'id': user_id,
+                        'username': username,
+                        'subscribed_at': subscribed_at.isoformat(),
+                    }) + '\n'
+                    for _, user_id, username, subscribed_at in batch
+                )
+                position = (batch[-1][3], batch[-1][0])
+
+        response = StreamingHttpResponse(generate(), content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="{confession.slug}-followers.ndjson"'
+        return response
 
 
 class PostViewSet(viewsets.ModelViewSet):
     """
     Postlar CRUD
     """
-    queryset = Post.objects.select_related('confession', 'author').prefetch_related('likes', 'comments')
+    queryset = Post.objects.select_related('confession', 'confession__admin', 'author').prefetch_related('likes', 'comments')
     permission_classes = [IsConfessionAdminOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['confession']
@@ -185,8 +398,7 @@ class PostViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def feed(self, request):
         """Foydalanuvchining obuna bo'lgan konfessiyalari postlari"""
-        subscriptions = Subscription.objects.filter(user=request.user).values_list('confession', flat=True)
-        posts = self.queryset.filter(confession__in=subscriptions)
+        posts = self.queryset.filter(confession__in=get_subscribed_confession_ids(request))
 
         page = self.paginate_queryset(posts)
         if page is not None:
@@ -203,13 +415,14 @@ class PostViewSet(viewsets.ModelViewSet):
         like, created = Like.objects.get_or_create(user=request.user, post=post)
         if created:
             # Create notification for confession admin
-            if post.confession.admin and post.confession.admin != request.user:
-                Notification.objects.create(
-                    recipient=post.confession.admin,
-                    actor=request.user,
+            admin_id = get_admin_id(post.confession_id)
+            if admin_id and admin_id != request.user.id:
+                create_notification(
+                    recipient_id=admin_id,
+                    actor_id=request.user.id,
                     notification_type='like',
-                    confession=post.confession,
-                    post=post
+                    confession_id=post.confession_id,
+                    post_id=post.id
                 )
             return Response({'message': 'Liked'}, status=status.HTTP_201_CREATED)
         return Response({'message': 'Already liked'}, status=status.HTTP_200_OK)
@@ -222,7 +435,7 @@ class PostViewSet(viewsets.ModelViewSet):
         if deleted:
             # Delete like notification (same as unsubscribe)
             Notification.objects.filter(
-                recipient=post.confession.admin,
+                recipient_id=get_admin_id(post.confession_id),
                 actor=request.user,
                 notification_type='like',
                 post=post
@@ -255,27 +468,27 @@ class CommentViewSet(viewsets.ModelViewSet):
 
         # Determine who to notify
         post = comment.post
-        recipient = None
+        recipient_id = None
         notif_type = 'comment'
 
         if comment.parent:
             # If this is a reply, notify the parent comment author
-            recipient = comment.parent.author
+            recipient_id = comment.parent.author_id
             notif_type = 'comment_reply'
-        elif post.confession.admin and post.confession.admin != self.request.user:
+        else:
             # If this is a top-level comment, notify the confession admin
-            recipient = post.confession.admin
+            recipient_id = get_admin_id(post.confession_id)
             notif_type = 'comment'
 
         # Create notification
-        if recipient and recipient != self.request.user:
-            Notification.objects.create(
-                recipient=recipient,
-                actor=self.request.user,
+        if recipient_id and recipient_id != self.request.user.id:
+            create_notification(
+                recipient_id=recipient_id,
+                actor_id=self.request.user.id,
                 notification_type=notif_type,
-                confession=post.confession,
-                post=post,
-                comment=comment
+                confession_id=post.confession_id,
+                post_id=post.id,
+                comment_id=comment.id
             )
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
@@ -286,14 +499,14 @@ class CommentViewSet(viewsets.ModelViewSet):
 
         if created:
             # Create notification for comment author (not for yourself)
-            if comment.author != request.user:
-                Notification.objects.create(
-                    recipient=comment.author,
-                    actor=request.user,
+            if comment.author_id != request.user.id:
+                create_notification(
+                    recipient_id=comment.author_id,
+                    actor_id=request.user.id,
                     notification_type='comment_like',
-                    confession=comment.post.confession,
-                    post=comment.post,
-                    comment=comment
+                    confession_id=comment.post.confession_id,
+                    post_id=comment.post_id,
+                    comment_id=comment.id
                 )
             return Response({'message': 'Comment liked'}, status=status.HTTP_201_CREATED)
         return Response({'message': 'Already liked'}, status=status.HTTP_200_OK)
@@ -307,7 +520,7 @@ class CommentViewSet(viewsets.ModelViewSet):
         if deleted:
             # Delete comment like notification
             Notification.objects.filter(
-                recipient=comment.author,
+                recipient_id=comment.author_id,
                 actor=request.user,
                 notification_type='comment_like',
                 comment=comment
@@ -330,7 +543,7 @@ class CommentViewSet(viewsets.ModelViewSet):
         post = comment.post
 
         # Only confession admin can pin
-        if post.confession.admin != request.user and request.user.role != 'superadmin':
+        if not is_confession_admin(request.user, post.confession_id) and request.user.role != 'superadmin':
             return Response({'error': 'Only confession admin can pin comments'}, status=status.HTTP_403_FORBIDDEN)
 
         comment.is_pinned = True
@@ -344,7 +557,7 @@ class CommentViewSet(viewsets.ModelViewSet):
         post = comment.post
 
         # Only confession admin can unpin
-        if post.confession.admin != request.user and request.user.role != 'superadmin':
+        if not is_confession_admin(request.user, post.confession_id) and request.user.role != 'superadmin':
             return Response({'error': 'Only confession admin can unpin comments'}, status=status.HTTP_403_FORBIDDEN)
 
         comment.is_pinned = False
@@ -360,7 +573,7 @@ class SubscriptionViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Subscription.objects.filter(user=self.request.user).select_related('confession')
+        return Subscription.objects.filter(user=self.request.user).select_related('confession', 'confession__admin')
 
 
 class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
@@ -377,13 +590,35 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
             'actor', 'confession', 'post', 'comment'
         )
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['last_seen_notification_id'] = self.request.user.last_seen_notification_id
+        return context
+
     @action(detail=False, methods=['post'])
     def mark_all_read(self, request):
-        """Mark all notifications as read"""
-        updated = Notification.objects.filter(
-            recipient=request.user,
-            is_read=False
-        ).update(is_read=True)
+        """Mark all notifications as read by moving the user's read watermark"""
+        user = request.user
+        watermark = user.last_seen_notification_id
+        latest_id = Notification.objects.filter(recipient=user).aggregate(
+            latest_id=Max('id')
+        )['latest_id'] or 0
+
+        updated = 0
+        if latest_id > watermark:
+            updated = Notification.objects.filter(
+                recipient=user,
+                id__gt=watermark,
+                id__lte=latest_id,
+                is_read=False
+            ).count()
+            # Single-row write; the filter keeps the watermark monotonic
+            get_user_model().objects.filter(
+                pk=user.pk,
+                last_seen_notification_id__lt=latest_id
+            ).update(last_seen_notification_id=latest_id)
+            user.last_seen_notification_id = latest_id
+
         return Response({
             'message': f'{updated} notifications marked as read'
         }, status=status.HTTP_200_OK)
@@ -392,8 +627,9 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     def mark_read(self, request, pk=None):
         """Mark a single notification as read"""
         notification = self.get_object()
-        notification.is_read = True
-        notification.save()
+        if not notification.is_read and notification.id > request.user.last_seen_notification_id:
+            notification.is_read = True
+            notification.save(update_fields=['is_read'])
         return Response({
             'message': 'Notification marked as read'
         }, status=status.HTTP_200_OK)
@@ -401,8 +637,33 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
         """Get count of unread notifications"""
+        if get_notification_filter(request.user.id).digest_only:
+            return Response({'count': 0}, status=status.HTTP_200_OK)
+
         count = Notification.objects.filter(
             recipient=request.user,
+            id__gt=request.user.last_seen_notification_id,
             is_read=False
         ).count()
-        return Response({'count': count}, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response({'count': count}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get', 'put', 'patch'])
+    def preferences(self, request):
+        """Get or update the user's notification preferences"""
+        if request.method == 'GET':
+            # Users who never saved preferences get the defaults without a row being written
+            preference = NotificationPreference.objects.filter(
+                user=request.user
+            ).first() or NotificationPreference(user=request.user)
+            return Response(NotificationPreferenceSerializer(preference).data)
+
+        preference, _ = NotificationPreference.objects.get_or_create(user=request.user)
+
+        serializer = NotificationPreferenceSerializer(
+            preference,
+            data=request.data,
+            partial=request.method == 'PATCH'
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_200_OK)
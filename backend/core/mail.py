@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+
+def queue_email(subject, body, to_email, from_email=''):
+    """Store an email for the worker instead of talking to SMTP in the request"""
+    return QueuedEmail.objects.create(
+        subject=subject,
+        body=body,
+        to_email=to_email,
+        from_email=from_email
+    )
+
+
+def _claimable(now):
+    """Due pending rows, plus rows a crashed worker left in 'sending'"""
+    stale_before = now - timedelta(seconds=settings.EMAIL_LOCK_TIMEOUT)
+    return Q(status='pending', next_attempt_at__lte=now) | Q(status='sending', locked_at__lt=stale_before)
+
+
+def claim_queued_emails(batch_size):
+    """
+    Claim up to batch_size rows with one conditional UPDATE each, so two
+    workers never send the same email. Returns the claimed rows.
+    """
+    now = timezone.now()
+    candidates = list(
+        QueuedEmail.objects.filter(_claimable(now)).order_by('next_attempt_at', 'id')[:batch_size]
+    )
+    claimed = []
+    for queued in candidates:
+        if QueuedEmail.objects.filter(_claimable(now), pk=queued.pk).update(status='sending', locked_at=now):
+            queued.status = 'sending'
+            queued.locked_at = now
+            claimed.append(queued)
+    return claimed
+
+
+def _record_failure(queued, error):
+    """Back off exponentially so a short SMTP outage doesn't burn through every attempt"""
+    queued.attempts += 1
+    queued.last_error = str(error)
+    queued.next_attempt_at = timezone.now() + timedelta(
+        seconds=settings.EMAIL_RETRY_BACKOFF * 2 ** (queued.attempts - 1)
+    )
+    queued.status = 'failed' if queued.attempts >= settings.EMAIL_MAX_ATTEMPTS else 'pending'
+    queued.locked_at = None
+    queued.save(update_fields=['attempts', 'last_error', 'next_attempt_at', 'status', 'locked_at'])
+
+
+def send_queued_emails(batch_size=None):
+    """
+    Claim and send one batch of due emails over a single backend connection.
+    Each email is sent and recorded on its own, so one refused recipient
+    neither blocks nor re-sends the rest of the batch.
+    Returns (sent, failed) counts for the batch.
+    """
+    batch = claim_queued_emails(batch_size or settings.EMAIL_BATCH_SIZE)
+    if not batch:
+        return 0, 0
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        for queued in batch:
+            _record_failure(queued, e)
+        return 0, len(batch)
+
+    sent = failed = 0
+    try:
+        for queued in batch:
+            message = EmailMessage(
+                subject=queued.subject,
+                body=queued.body,
+                from_email=queued.from_email or settings.DEFAULT_FROM_EMAIL,
+                to=[queued.to_email],
+                connection=connection
+            )
+            try:
+                message.send()
+            except Exception as e:
+                _record_failure(queued, e)
+                failed += 1
+                continue
+            QueuedEmail.objects.filter(pk=queued.pk).update(
+                status='sent', sent_at=timezone.now(), locked_at=None
+            )
+            sent += 1
+    finally:
+        connection.close()
+    return sent, failed
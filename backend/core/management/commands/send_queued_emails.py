@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.mail import send_queued_emails
+
+
+class Command(BaseCommand):
+    help = 'Send pending queued emails in batches, one connection per batch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Emails per connection')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new emails')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_queued_emails(batch_size=options['batch_size'])
+            if sent:
+                self.stdout.write(self.style.SUCCESS(f'Sent {sent} email(s)'))
+            if failed:
+                self.stdout.write(self.style.WARNING(f'{failed} email(s) failed, will retry'))
+
+            # Drain the queue before sleeping; a batch that only failed means
+            # the backend is down, and failed rows wait for next_attempt_at
+            if sent:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
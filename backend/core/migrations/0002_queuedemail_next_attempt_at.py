@@ -0,0 +1,27 @@
+# Generated by Django 4.2.25 on 2026-10-19 05:55
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='queuedemail',
+            name='core_queued_status_c31843_idx',
+        ),
+        migrations.AddField(
+            model_name='queuedemail',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Pushed back exponentially after each failed attempt'),
+        ),
+        migrations.AddIndex(
+            model_name='queuedemail',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='core_queued_status_dc1e67_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import models
+from django.utils import timezone
+
+
+class QueuedEmail(models.Model):
+    """Outgoing email waiting for the send_queued_emails worker"""
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+
+    to_email = models.EmailField()
+    from_email = models.CharField(max_length=255, blank=True, help_text="Empty means DEFAULT_FROM_EMAIL")
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now, help_text="Pushed back exponentially after each failed attempt")
+    locked_at = models.DateTimeField(null=True, blank=True, help_text="Set when a worker claims the row for sending")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
+
+    class Meta:
+        ordering = ['created_at']
+        verbose_name = 'Queued Email'
+        verbose_name_plural = 'Queued Emails'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
@@ -1,4 +1,13 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
 
 class StandardResultsSetPagination(PageNumberPagination):
     page_size = 10
@@ -9,4 +18,202 @@ class StandardResultsSetPagination(PageNumberPagination):
 class LargeResultsSetPagination(PageNumberPagination):
     page_size = 50
     page_size_query_param = 'page_size'
-    max_page_size = 200
\ No newline at end of file
+    max_page_size = 200
+
+
+class KeysetPagination(BasePagination):
+    """
+    Newest-first cursor pagination on (ordering_field, id).
+    Works with model instances and values() rows; each page is one
+    index range scan no matter how deep the client pages.
+    """
+    ordering_field = 'created_at'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        if position is not None:
+            value, pk = position
+            queryset = queryset.filter(
+                Q(**{f'{self.ordering_field}__lt': value}) |
+                Q(**{self.ordering_field: value, 'id__lt': pk})
+            )
+
+        rows = list(queryset.order_by(f'-{self.ordering_field}', '-id')[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_position = self._position(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def _position(self, row):
+        if isinstance(row, dict):
+            value, pk = row[self.ordering_field], row['id']
+        else:
+            value, pk = getattr(row, self.ordering_field), row.pk
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        return value, pk
+
+    def encode_cursor(self, position):
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            value, pk = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            return self.parse_cursor_value(value), int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def parse_cursor_value(self, value):
+        """Ordering fields are datetimes; a tampered value must not reach the filter"""
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValueError(value)
+        return parsed
+
+    def get_next_link(self):
+        if not self.next_position:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+
+class AnchoredKeysetPagination(BasePagination):
+    """
+    Keyset pagination around an anchor row: ?before=<id> / ?after=<id>.
+    Without an anchor the newest page is returned. Rows are selected
+    newest-first (oldest-first with ?after=) on (ordering_field, id) and
+    always returned in chronological order.
+    """
+    ordering_field = 'created_at'
+    page_size = 50
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    before_query_param = 'before'
+    after_query_param = 'after'
+    invalid_anchor_message = 'Invalid anchor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.paginate_querysets([queryset], request, view)
+
+    def paginate_querysets(self, querysets, request, view=None):
+        """
+        Paginate several querysets (e.g. storage tiers) as one ordered stream.
+        Each contributes at most page_size + 1 rows from its own index range.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        before = self.get_anchor(request, self.before_query_param)
+        after = self.get_anchor(request, self.after_query_param) if before is None else None
+        anchor = before if before is not None else after
+        value = self.get_anchor_value(querysets, anchor) if anchor is not None else None
+
+        rows = []
+        for queryset in querysets:
+            if after is not None:
+                queryset = queryset.filter(
+                    Q(**{f'{self.ordering_field}__gt': value}) |
+                    Q(**{self.ordering_field: value, 'id__gt': after})
+                ).order_by(self.ordering_field, 'id')
+            else:
+                if before is not None:
+                    queryset = queryset.filter(
+                        Q(**{f'{self.ordering_field}__lt': value}) |
+                        Q(**{self.ordering_field: value, 'id__lt': before})
+                    )
+                queryset = queryset.order_by(f'-{self.ordering_field}', '-id')
+            rows.extend(queryset[:page_size + 1])
+
+        rows.sort(key=lambda row: (getattr(row, self.ordering_field), row.pk), reverse=after is None)
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if after is None:
+            rows.reverse()
+
+        # Older rows exist past a before-page with more rows, or behind any after-anchor
+        self.older_anchor = rows[0].pk if rows and (after is not None or has_more) else None
+        self.newer_anchor = rows[-1].pk if rows and (before is not None or (after is not None and has_more)) else None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_anchor(self, request, param):
+        anchor = request.query_params.get(param)
+        if not anchor:
+            return None
+        try:
+            return int(anchor)
+        except ValueError:
+            raise NotFound(self.invalid_anchor_message)
+
+    def get_anchor_value(self, querysets, anchor):
+        # The anchor may be filtered out of the page queryset (e.g. soft-deleted), so look it up unscoped
+        for queryset in querysets:
+            value = queryset.model._default_manager.filter(pk=anchor).values_list(
+                self.ordering_field, flat=True
+            ).first()
+            if value is not None:
+                return value
+        raise NotFound(self.invalid_anchor_message)
+
+    def get_link(self, param, anchor):
+        if anchor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.before_query_param)
+        url = remove_query_param(url, self.after_query_param)
+        return replace_query_param(url, param, anchor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'older': self.get_link(self.before_query_param, self.older_anchor),
+            'newer': self.get_link(self.after_query_param, self.newer_anchor),
+            'results': data
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'older': {'type': 'string', 'nullable': True},
+                'newer': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
@@ -1,5 +1,12 @@
 from django.contrib import admin
-from .models import Conversation, Message, MessageRead, MessageAttachment
+from .models import ArchivedMessage, Conversation, ConversationMember, Message, MessageRead, MessageAttachment
+
+
+class ConversationMemberInline(admin.TabularInline):
+    model = ConversationMember
+    extra = 0
+    raw_id_fields = ['user']
+    readonly_fields = ['joined_at', 'unread_count', 'last_read_message_id', 'last_delivered_message_id']
 
 
 @admin.register(Conversation)
@@ -7,8 +14,9 @@ class ConversationAdmin(admin.ModelAdmin):
     list_display = ['id', 'get_participants', 'confession', 'last_message_at', 'created_at']
     list_filter = ['created_at', 'confession']
     search_fields = ['participants__username', 'confession__name']
-    raw_id_fields = ['confession']
-    filter_horizontal = ['participants']
+    raw_id_fields = ['confession', 'last_message']
+    readonly_fields = ['last_message_preview']
+    inlines = [ConversationMemberInline]
 
     def get_participants(self, obj):
         return ', '.join([p.username for p in obj.participants.all()[:5]])
@@ -30,6 +38,22 @@ class MessageAdmin(admin.ModelAdmin):
     content_preview.short_description = 'Content'
 
 
+@admin.register(ArchivedMessage)
+class ArchivedMessageAdmin(admin.ModelAdmin):
+    list_display = ['id', 'sender', 'conversation', 'content_preview', 'created_at', 'archived_at']
+    list_filter = ['archived_at']
+    raw_id_fields = ['conversation', 'sender']
+    exclude = ['content_compressed']
+    readonly_fields = ['content_preview', 'archived_at']
+
+    def content_preview(self, obj):
+        content = obj.content
+        if content:
+            return content[:50] + '...' if len(content) > 50 else content
+        return '[No content]'
+    content_preview.short_description = 'Content'
+
+
 @admin.register(MessageRead)
 class MessageReadAdmin(admin.ModelAdmin):
     list_display = ['id', 'message', 'user', 'delivered_at', 'read_at']
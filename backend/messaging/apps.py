@@ -1,6 +1,7 @@
 from django.apps import AppConfig
 from django.db import connection
 from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 from django.dispatch import receiver
 
 
@@ -9,9 +10,10 @@ class MessagingConfig(AppConfig):
     name = "messaging"
 
     def ready(self):
-        """Enable SQLite WAL mode for better concurrency"""
-        # Import signals if needed
-        pass
+        import messaging.signals
+        from messaging.search import ensure_search_triggers
+
+        post_migrate.connect(ensure_search_triggers, sender=self)
 
 
 @receiver(connection_created)
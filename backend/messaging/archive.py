@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ArchivedMessage, Conversation, Message
+
+ARCHIVED_FIELDS = [
+    'id', 'conversation_id', 'sender_id', 'content', 'reply_to_id', 'is_edited',
+    'is_pinned', 'is_deleted', 'created_at', 'updated_at', 'edited_at',
+]
+
+
+def archive_cutoff(months=None):
+    months = months or settings.MESSAGE_ARCHIVE_AFTER_MONTHS
+    return timezone.now() - timedelta(days=30 * months)
+
+
+def archivable_messages(cutoff):
+    """
+    Messages older than cutoff in conversations with no activity since.
+    Messages that other rows still point at stay hot: attachments hang off
+    them, pinned ones are served by the pin endpoints, the conversation's
+    last_message feeds the inbox, and hot replies would lose their reply_to.
+    A reply target becomes archivable once its replies have been archived.
+    """
+    inactive = Conversation.objects.filter(
+        Q(last_message_at__lt=cutoff) |
+        Q(last_message_at__isnull=True, updated_at__lt=cutoff)
+    )
+    return Message.objects.filter(
+        conversation__in=inactive,
+        created_at__lt=cutoff,
+        is_pinned=False,
+        attachments__isnull=True,
+        replies__isnull=True
+    ).exclude(
+        id__in=Conversation.objects.filter(last_message__isnull=False).values('last_message_id')
+    )
+
+
+def archive_old_messages(months=None, batch_size=None):
+    """
+    Move archivable messages to ArchivedMessage in chunks.
+    Each chunk is copied and deleted in one transaction, so an interrupted
+    run leaves every message in exactly one tier. Returns the number moved.
+    """
+    batch_size = batch_size or settings.MESSAGE_ARCHIVE_BATCH_SIZE
+    cutoff = archive_cutoff(months)
+    moved = 0
+
+    while True:
+        rows = list(
+            archivable_messages(cutoff).order_by('id').values(*ARCHIVED_FIELDS)[:batch_size]
+        )
+        if not rows:
+            break
+
+        archived = []
+        for row in rows:
+            row['content_compressed'] = ArchivedMessage.compress(row.pop('content'))
+            archived.append(ArchivedMessage(**row))
+
+        with transaction.atomic():
+            ArchivedMessage.objects.bulk_create(archived, ignore_conflicts=True)
+            Conversation.objects.filter(
+                id__in={row['conversation_id'] for row in rows},
+                has_archived_messages=False
+            ).update(has_archived_messages=True)
+            Message.objects.filter(id__in=[row['id'] for row in rows]).delete()
+
+        moved += len(rows)
+
+    return moved
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.db import transaction
+from rest_framework import serializers
+
+from .models import Conversation, ConversationMember, Message
+from .realtime import broadcast_to_conversations
+
+_datetime_field = serializers.DateTimeField()
+
+
+def broadcast_message(sender, conversation_ids, content, serializer_context=None, batch_size=None):
+    """
+    Post the same message into every conversation in conversation_ids.
+
+    Per batch: one bulk INSERT of messages, one CASE-based UPDATE of the
+    conversation inbox columns, one UPDATE of the members' unread and
+    activity columns, then a single concurrent fan-out over the channel layer. The socket payload
+    is serialized once and only the per-message fields are swapped in.
+    Returns the number of messages created.
+    """
+    from .serializers import MessageSerializer
+
+    batch_size = batch_size or settings.MESSAGE_BROADCAST_BATCH_SIZE
+    conversation_ids = sorted(set(conversation_ids))
+    template = None
+    created = 0
+
+    for start in range(0, len(conversation_ids), batch_size):
+        batch_ids = conversation_ids[start:start + batch_size]
+
+        with transaction.atomic():
+            messages = Message.objects.bulk_create([
+                Message(conversation_id=conversation_id, sender=sender, content=content)
+                for conversation_id in batch_ids
+            ])
+            preview = messages[0].preview_text()
+            Conversation.objects.bulk_update([
+                Conversation(
+                    id=message.conversation_id,
+                    last_message_id=message.id,
+                    last_message_at=message.created_at,
+                    last_message_preview=preview
+                )
+                for message in messages
+            ], ['last_message', 'last_message_at', 'last_message_preview'])
+            ConversationMember.objects.filter(conversation_id__in=batch_ids).update(
+                **ConversationMember.new_message_updates(sender.id, messages[-1].created_at)
+            )
+
+        if template is None:
+            template = MessageSerializer(messages[0], context=serializer_context or {}).data
+        broadcast_to_conversations({
+            message.conversation_id: {
+                'type': 'chat_message_handler',
+                'message': {
+                    **template,
+                    'id': message.id,
+                    'conversation': message.conversation_id,
+                    'created_at': _datetime_field.to_representation(message.created_at),
+                    'updated_at': _datetime_field.to_representation(message.updated_at),
+                }
+            }
+            for message in messages
+        })
+        created += len(messages)
+
+    return created
@@ -3,8 +3,11 @@ from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from .models import Conversation, Message, MessageRead, MessageAttachment
+from .models import Conversation, Message, MessageAttachment
 from .serializers import MessageSerializer
+from .realtime import conversation_group_name
+from .membership import is_conversation_member
+from confessions.registry import is_confession_admin
 
 User = get_user_model()
 
@@ -25,7 +28,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
             return
 
         self.conversation_id = self.scope['url_route']['kwargs']['conversation_id']
-        self.conversation_group_name = f'chat_{self.conversation_id}'
+        self.conversation_group_name = conversation_group_name(self.conversation_id)
 
         # Verify user is participant in conversation
         is_participant = await self.check_participant()
@@ -151,15 +154,15 @@ class ChatConsumer(AsyncWebsocketConsumer):
         """Handle read receipt"""
         message_id = data.get('message_id')
 
-        if message_id:
-            await self.mark_message_as_read(message_id)
-
-            # Broadcast read receipt
+        # Only a message of this conversation that moves the reader's
+        # watermark forward is announced; anything else is dropped
+        read_up_to = await self.mark_message_as_read(message_id) if message_id else None
+        if read_up_to:
             await self.channel_layer.group_send(
                 self.conversation_group_name,
                 {
                     'type': 'read_receipt_handler',
-                    'message_id': message_id,
+                    'message_id': read_up_to,
                     'user_id': self.user.id,
                     'username': self.user.username,
                     'read_at': timezone.now().isoformat()
@@ -232,6 +235,10 @@ class ChatConsumer(AsyncWebsocketConsumer):
             'message': event['message']
         }))
 
+        # The message reached this recipient's socket: advance their delivered watermark
+        if event['message']['sender']['id'] != self.user.id:
+            await self.mark_message_as_delivered(event['message']['id'])
+
     async def typing_indicator(self, event):
         """Send typing indicator to WebSocket"""
         # Don't send typing indicator to self
@@ -290,11 +297,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
     @database_sync_to_async
     def check_participant(self):
         """Check if user is participant in conversation"""
-        try:
-            conversation = Conversation.objects.get(id=self.conversation_id)
-            return conversation.participants.filter(id=self.user.id).exists()
-        except Conversation.DoesNotExist:
-            return False
+        return is_conversation_member(self.user.id, self.conversation_id)
 
     @database_sync_to_async
     def create_message(self, content, reply_to_id=None):
@@ -313,14 +316,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 reply_to=reply_to
             )
 
-            # Create MessageRead records for other participants
-            other_participants = conversation.participants.exclude(id=self.user.id)
-            for participant in other_participants:
-                MessageRead.objects.create(message=message, user=participant)
-
-            # Update conversation's last_message_at
-            conversation.last_message_at = timezone.now()
-            conversation.save(update_fields=['last_message_at'])
+            # Update the inbox columns and unread counters
+            conversation.record_new_message(message)
 
             return message
         except Exception as e:
@@ -340,23 +337,24 @@ class ChatConsumer(AsyncWebsocketConsumer):
         serializer = MessageSerializer(message, context={'request': Request(request)})
         return serializer.data
 
+    @database_sync_to_async
+    def mark_message_as_delivered(self, message_id):
+        """Mark message as delivered"""
+        Conversation(pk=self.conversation_id).mark_delivered_up_to(self.user, message_id)
+
     @database_sync_to_async
     def mark_message_as_read(self, message_id):
-        """Mark message as read"""
+        """Advance the read watermark to a message of this conversation; returns its id if it moved"""
         try:
-            message = Message.objects.get(id=message_id)
-            message_read, created = MessageRead.objects.get_or_create(
-                message=message,
-                user=self.user
-            )
-
-            if not message_read.read_at:
-                message_read.mark_as_read()
-
-            return True
+            message = Message.objects.get(id=message_id, conversation_id=self.conversation_id)
+            if message.conversation.mark_read_up_to(self.user, message.id):
+                return message.id
+            return None
+        except (Message.DoesNotExist, ValueError):
+            return None
         except Exception as e:
             print(f"Error marking message as read: {e}")
-            return False
+            return None
 
     @database_sync_to_async
     def edit_message(self, message_id, new_content):
@@ -373,6 +371,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
             message.content = new_content
             message.mark_as_edited()
+            if message.conversation.last_message_id == message.id:
+                message.conversation.refresh_last_message()
 
             return True, message
         except Exception as e:
@@ -389,8 +389,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
             if message.sender != self.user:
                 return False
 
-            message.is_deleted = True
-            message.save(update_fields=['is_deleted'])
+            message.soft_delete()
 
             return True
         except Exception as e:
@@ -405,8 +404,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
             conversation = message.conversation
 
             # Check permissions - only confession admin can pin
-            if conversation.confession:
-                if conversation.confession.admin != self.user and self.user.role != 'superadmin':
+            if conversation.confession_id:
+                if not is_confession_admin(self.user, conversation.confession_id) and self.user.role != 'superadmin':
                     return False, None
 
             message.is_pinned = is_pinned
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from messaging.archive import archive_old_messages
+
+
+class Command(BaseCommand):
+    help = 'Move old messages of inactive conversations to the compressed archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=None, help='Archive messages older than this many months')
+        parser.add_argument('--batch-size', type=int, default=None, help='Messages per chunk')
+
+    def handle(self, *args, **options):
+        moved = archive_old_messages(months=options['months'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} message(s)'))
@@ -0,0 +1,78 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Q
+
+from messaging.models import ConversationMember, Message, MessageRead
+
+
+class Command(BaseCommand):
+    help = 'Convert legacy MessageRead rows into per-member delivered/read watermarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Conversation members (or receipts when purging) per chunk')
+        parser.add_argument('--purge', action='store_true', help='Delete the converted MessageRead rows')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = 0
+        converted = 0
+        purged = 0
+
+        while True:
+            members = list(
+                ConversationMember.objects.filter(id__gt=last_id).order_by('id')[:batch_size]
+            )
+            if not members:
+                break
+            last_id = members[-1].id
+
+            conversation_ids = {member.conversation_id for member in members}
+            user_ids = {member.user_id for member in members}
+            receipts = MessageRead.objects.filter(
+                message__conversation_id__in=conversation_ids,
+                user_id__in=user_ids
+            )
+
+            # One grouped query per chunk: highest delivered and read message id per (conversation, user)
+            watermarks = {
+                (row['message__conversation_id'], row['user_id']): row
+                for row in receipts.values('message__conversation_id', 'user_id').annotate(
+                    delivered=Max('message_id'),
+                    read=Max('message_id', filter=Q(read_at__isnull=False))
+                )
+            }
+
+            changed = []
+            for member in members:
+                row = watermarks.get((member.conversation_id, member.user_id))
+                if not row:
+                    continue
+                read = max(member.last_read_message_id, row['read'] or 0)
+                delivered = max(member.last_delivered_message_id, row['delivered'] or 0, read)
+                if read == member.last_read_message_id and delivered == member.last_delivered_message_id:
+                    continue
+                if read != member.last_read_message_id:
+                    member.unread_count = Message.objects.filter(
+                        conversation_id=member.conversation_id,
+                        id__gt=read
+                    ).exclude(sender_id=member.user_id).count()
+                member.last_read_message_id = read
+                member.last_delivered_message_id = delivered
+                changed.append(member)
+
+            ConversationMember.objects.bulk_update(
+                changed,
+                ['last_read_message_id', 'last_delivered_message_id', 'unread_count']
+            )
+
+            converted += len(changed)
+            self.stdout.write(f'Converted {converted} member(s) up to id {last_id}')
+
+        # Purge only after every member is converted; a chunk's receipts can belong to later chunks
+        if options['purge']:
+            while True:
+                ids = list(MessageRead.objects.order_by('id').values_list('id', flat=True)[:batch_size])
+                if not ids:
+                    break
+                purged += MessageRead.objects.filter(id__in=ids).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(f'Done: {converted} member(s) updated, {purged} receipt(s) deleted'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from messaging.retention import purge_expired_messages
+
+
+class Command(BaseCommand):
+    help = 'Delete chat messages past their confession\'s retention window, in small batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Messages per batch')
+        parser.add_argument('--pause', type=float, default=None, help='Seconds to sleep between batches')
+
+    def handle(self, *args, **options):
+        results = purge_expired_messages(batch_size=options['batch_size'], pause=options['pause'])
+        for slug, deleted in results.items():
+            self.stdout.write(f'{slug}: {deleted} message(s) deleted')
+        self.stdout.write(self.style.SUCCESS(f'Purged {sum(results.values())} message(s)'))
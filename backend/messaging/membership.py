@@ -0,0 +1,63 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+CONVERSATION_VERSION_KEY = 'conversations_version_{}'
+CONVERSATION_CACHE_KEY = 'conversations_{}_v{}'
+
+
+def _conversation_version(user_id):
+    key = CONVERSATION_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        # A timestamp never collides with a version that was evicted earlier
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_user_conversations(*user_ids):
+    """Bump each user's version so their cached conversation sets go stale"""
+    for user_id in user_ids:
+        key = CONVERSATION_VERSION_KEY.format(user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def get_user_conversation_ids(user_id):
+    """Cached frozenset of conversation ids the user is a member of"""
+    from .models import ConversationMember
+
+    key = CONVERSATION_CACHE_KEY.format(user_id, _conversation_version(user_id))
+    conversation_ids = cache.get(key)
+    if conversation_ids is None:
+        conversation_ids = frozenset(
+            ConversationMember.objects.filter(user_id=user_id).values_list('conversation_id', flat=True)
+        )
+        cache.set(key, conversation_ids, settings.CONVERSATION_MEMBERSHIP_CACHE_TIMEOUT)
+    return conversation_ids
+
+
+def get_member_conversation_ids(request):
+    """
+    Same set as get_user_conversation_ids, memoized on the request so
+    repeated permission checks hit the cache once per request.
+    """
+    if not request or not request.user.is_authenticated:
+        return frozenset()
+
+    conversation_ids = getattr(request, '_member_conversation_ids', None)
+    if conversation_ids is None:
+        conversation_ids = get_user_conversation_ids(request.user.id)
+        request._member_conversation_ids = conversation_ids
+    return conversation_ids
+
+
+def is_conversation_member(user_id, conversation_id):
+    try:
+        return int(conversation_id) in get_user_conversation_ids(user_id)
+    except (TypeError, ValueError):
+        return False
@@ -0,0 +1,94 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_inbox(apps, schema_editor):
+    Conversation = apps.get_model('messaging', 'Conversation')
+    ConversationMember = apps.get_model('messaging', 'ConversationMember')
+    Message = apps.get_model('messaging', 'Message')
+    MessageRead = apps.get_model('messaging', 'MessageRead')
+
+    for conversation in Conversation.objects.all().iterator():
+        last_message = Message.objects.filter(
+            conversation=conversation,
+            is_deleted=False
+        ).order_by('-created_at', '-id').first()
+        Conversation.objects.filter(pk=conversation.pk).update(
+            last_message=last_message,
+            last_message_preview=(last_message.content or '')[:100] if last_message else ''
+        )
+
+    for member in ConversationMember.objects.all().iterator():
+        read_ids = MessageRead.objects.filter(
+            message__conversation_id=member.conversation_id,
+            user_id=member.user_id,
+            read_at__isnull=False
+        ).values('message_id')
+        unread = Message.objects.filter(
+            conversation_id=member.conversation_id
+        ).exclude(sender_id=member.user_id).exclude(id__in=read_ids).count()
+        last_read = MessageRead.objects.filter(
+            message__conversation_id=member.conversation_id,
+            user_id=member.user_id,
+            read_at__isnull=False
+        ).aggregate(last=models.Max('message_id'))['last'] or 0
+        ConversationMember.objects.filter(pk=member.pk).update(
+            unread_count=unread,
+            last_read_message_id=last_read
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('messaging', '0001_initial'),
+    ]
+
+    operations = [
+        # Promote the auto-created participants table to an explicit model
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='ConversationMember',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('conversation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='members', to='messaging.conversation')),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversation_memberships', to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'db_table': 'messaging_conversation_participants',
+                        'unique_together': {('conversation', 'user')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='conversation',
+                    name='participants',
+                    field=models.ManyToManyField(related_name='conversations', through='messaging.ConversationMember', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+            database_operations=[],
+        ),
+        migrations.AddField(
+            model_name='conversationmember',
+            name='unread_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='conversationmember',
+            name='last_read_message_id',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='messaging.message'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_preview',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.RunPython(backfill_inbox, migrations.RunPython.noop),
+    ]
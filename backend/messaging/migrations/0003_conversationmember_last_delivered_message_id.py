@@ -0,0 +1,18 @@
+# Generated by Django 4.2.25 on 2026-10-19 05:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0002_conversationmember_inbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversationmember',
+            name='last_delivered_message_id',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.25 on 2026-10-19 05:33
+
+from itertools import groupby
+
+from django.db import migrations, models
+
+
+def backfill_participant_key(apps, schema_editor):
+    Conversation = apps.get_model('messaging', 'Conversation')
+    ConversationMember = apps.get_model('messaging', 'ConversationMember')
+
+    confession_ids = dict(Conversation.objects.values_list('id', 'confession_id'))
+    memberships = ConversationMember.objects.order_by('conversation_id').values_list('conversation_id', 'user_id')
+
+    # Only direct conversations get a key; the oldest of any existing duplicates keeps it
+    seen = set()
+    batch = []
+    for conversation_id, rows in groupby(memberships.iterator(), key=lambda row: row[0]):
+        user_ids = sorted({user_id for _, user_id in rows})
+        if len(user_ids) > 2:
+            continue
+        key = f"{confession_ids.get(conversation_id) or 0}:{','.join(str(user_id) for user_id in user_ids)}"
+        if key in seen:
+            continue
+        seen.add(key)
+        batch.append(Conversation(id=conversation_id, participant_key=key))
+        if len(batch) >= 500:
+            Conversation.objects.bulk_update(batch, ['participant_key'])
+            batch = []
+    Conversation.objects.bulk_update(batch, ['participant_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0003_conversationmember_last_delivered_message_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='participant_key',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+        migrations.RunPython(backfill_participant_key, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,86 @@
+from django.db import migrations
+
+
+SQLITE_FORWARD = [
+    # External-content FTS5 table: stores only the index, the text stays in messaging_message
+    """
+    CREATE VIRTUAL TABLE messaging_message_fts USING fts5(
+        content,
+        content='messaging_message',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER messaging_message_fts_insert AFTER INSERT ON messaging_message
+    WHEN new.is_deleted = 0 AND new.content IS NOT NULL
+    BEGIN
+        INSERT INTO messaging_message_fts(rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+    # One trigger so the old entry is always removed before the new one is added
+    """
+    CREATE TRIGGER messaging_message_fts_update AFTER UPDATE OF content, is_deleted ON messaging_message
+    BEGIN
+        INSERT INTO messaging_message_fts(messaging_message_fts, rowid, content)
+        SELECT 'delete', old.id, old.content WHERE old.is_deleted = 0 AND old.content IS NOT NULL;
+        INSERT INTO messaging_message_fts(rowid, content)
+        SELECT new.id, new.content WHERE new.is_deleted = 0 AND new.content IS NOT NULL;
+    END
+    """,
+    """
+    CREATE TRIGGER messaging_message_fts_delete AFTER DELETE ON messaging_message
+    WHEN old.is_deleted = 0 AND old.content IS NOT NULL
+    BEGIN
+        INSERT INTO messaging_message_fts(messaging_message_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    END
+    """,
+    """
+    INSERT INTO messaging_message_fts(rowid, content)
+    SELECT id, content FROM messaging_message WHERE is_deleted = 0 AND content IS NOT NULL
+    """,
+]
+
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS messaging_message_fts_insert',
+    'DROP TRIGGER IF EXISTS messaging_message_fts_update',
+    'DROP TRIGGER IF EXISTS messaging_message_fts_delete',
+    'DROP TABLE IF EXISTS messaging_message_fts',
+]
+
+POSTGRESQL_FORWARD = [
+    # Generated column: PostgreSQL keeps it current on insert, edit and soft-delete
+    """
+    ALTER TABLE messaging_message ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        CASE WHEN is_deleted THEN NULL ELSE to_tsvector('simple', coalesce(content, '')) END
+    ) STORED
+    """,
+    'CREATE INDEX messaging_message_search_vector_idx ON messaging_message USING GIN (search_vector)',
+]
+
+POSTGRESQL_REVERSE = [
+    'DROP INDEX IF EXISTS messaging_message_search_vector_idx',
+    'ALTER TABLE messaging_message DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def run_statements(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0004_conversation_participant_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_statements({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRESQL_FORWARD}),
+            run_statements({'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRESQL_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.25 on 2026-10-19 05:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_attachment_conversation(apps, schema_editor):
+    Message = apps.get_model('messaging', 'Message')
+    MessageAttachment = apps.get_model('messaging', 'MessageAttachment')
+    MessageAttachment.objects.filter(conversation__isnull=True).update(
+        conversation_id=models.Subquery(
+            Message.objects.filter(id=models.OuterRef('message_id')).values('conversation_id')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0006_archivedmessage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='messageattachment',
+            name='conversation',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attachments', to='messaging.conversation'),
+        ),
+        migrations.AddField(
+            model_name='messageattachment',
+            name='thumbnail',
+            field=models.ImageField(blank=True, null=True, upload_to='messages/thumbnails/%Y/%m/%d/'),
+        ),
+        migrations.RunPython(backfill_attachment_conversation, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='messageattachment',
+            index=models.Index(fields=['conversation', 'file_type', '-uploaded_at'], name='messaging_m_convers_3732a8_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.25 on 2026-10-19 05:41
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def backfill_membership(apps, schema_editor):
+    Conversation = apps.get_model('messaging', 'Conversation')
+    ConversationMember = apps.get_model('messaging', 'ConversationMember')
+
+    ConversationMember.objects.update(
+        joined_at=models.Subquery(
+            Conversation.objects.filter(id=models.OuterRef('conversation_id')).values('created_at')[:1]
+        )
+    )
+    ConversationMember.objects.filter(
+        conversation__confession__isnull=False,
+        user_id=models.F('conversation__confession__admin_id')
+    ).update(role='admin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0007_messageattachment_conversation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversationmember',
+            name='joined_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='conversationmember',
+            name='role',
+            field=models.CharField(choices=[('member', 'Member'), ('admin', 'Admin')], default='member', max_length=10),
+        ),
+        migrations.RunPython(backfill_membership, migrations.RunPython.noop),
+    ]
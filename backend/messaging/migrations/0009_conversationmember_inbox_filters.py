@@ -0,0 +1,66 @@
+# Generated by Django 4.2.25 on 2026-10-19 05:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models.functions import Coalesce
+import django.utils.timezone
+
+
+def backfill_inbox_filters(apps, schema_editor):
+    ConversationMember = apps.get_model('messaging', 'ConversationMember')
+    Conversation = apps.get_model('messaging', 'Conversation')
+
+    conversation = Conversation.objects.filter(pk=models.OuterRef('conversation_id'))
+    ConversationMember.objects.update(
+        confession_id=models.Subquery(conversation.values('confession_id')[:1]),
+        last_activity_at=models.Subquery(conversation.annotate(
+            activity=Coalesce('last_message_at', 'created_at')
+        ).values('activity')[:1]),
+    )
+    last_sender = models.Subquery(conversation.values('last_message__sender_id')[:1])
+    ConversationMember.objects.annotate(last_sender=last_sender).filter(
+        last_sender__isnull=False
+    ).exclude(last_sender=models.F('user_id')).update(awaiting_reply=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('confessions', '0013_confession_message_retention_days'),
+        ('messaging', '0008_conversationmember_role_joined_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversationmember',
+            name='awaiting_reply',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='conversationmember',
+            name='confession',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='confessions.confession'),
+        ),
+        migrations.AddField(
+            model_name='conversationmember',
+            name='last_activity_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(backfill_inbox_filters, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='conversationmember',
+            index=models.Index(fields=['user', '-last_activity_at', '-id'], name='member_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversationmember',
+            index=models.Index(fields=['user', 'confession', '-last_activity_at', '-id'], name='member_inbox_confession_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversationmember',
+            index=models.Index(fields=['user', 'awaiting_reply', '-last_activity_at', '-id'], name='member_inbox_awaiting_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversationmember',
+            index=models.Index(condition=models.Q(('unread_count__gt', 0)), fields=['user', '-last_activity_at', '-id'], name='member_inbox_unread_idx'),
+        ),
+    ]
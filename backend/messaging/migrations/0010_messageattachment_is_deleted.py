@@ -0,0 +1,36 @@
+# Generated by Django 4.2.25 on 2026-10-19 06:00
+
+from django.db import migrations, models
+
+
+def backfill_is_deleted(apps, schema_editor):
+    MessageAttachment = apps.get_model('messaging', 'MessageAttachment')
+    MessageAttachment.objects.filter(message__is_deleted=True).update(is_deleted=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0009_conversationmember_inbox_filters'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='messageattachment',
+            name='messaging_m_convers_3732a8_idx',
+        ),
+        migrations.AddField(
+            model_name='messageattachment',
+            name='is_deleted',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(backfill_is_deleted, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='messageattachment',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['conversation', 'file_type', '-uploaded_at', '-id'], name='attachment_gallery_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='messageattachment',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['conversation', '-uploaded_at', '-id'], name='attachment_gallery_idx'),
+        ),
+    ]
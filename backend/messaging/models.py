@@ -1,9 +1,17 @@
 from django.db import models, transaction
+from django.db.models import Case, Count, F, Max, Min, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest, Substr
 from django.conf import settings
+from django.core.files.base import ContentFile
 from django.utils import timezone
 from datetime import timedelta
-import time
-from django.db.utils import OperationalError
+from io import BytesIO
+import os
+import zlib
+
+from PIL import Image, ImageOps
+
+from .membership import invalidate_user_conversations
 
 
 class Conversation(models.Model):
@@ -13,12 +21,30 @@ class Conversation(models.Model):
     """
     participants = models.ManyToManyField(
         settings.AUTH_USER_MODEL,
-        related_name='conversations'
+        related_name='conversations',
+        through='ConversationMember'
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     last_message_at = models.DateTimeField(null=True, blank=True)
 
+    # Denormalized inbox columns, maintained by record_new_message/refresh_last_message
+    last_message = models.ForeignKey(
+        'Message',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    last_message_preview = models.CharField(max_length=100, blank=True)
+
+    # "<confession_id or 0>:<sorted participant ids>" for direct conversations;
+    # unique so a pair has at most one conversation per confession context
+    participant_key = models.CharField(max_length=64, null=True, blank=True, unique=True, editable=False)
+
+    # Set once any message has been moved to ArchivedMessage; history reads only hit the archive when true
+    has_archived_messages = models.BooleanField(default=False)
+
     # For one-to-one conversations with confession context
     confession = models.ForeignKey(
         'confessions.Confession',
@@ -42,44 +68,216 @@ class Conversation(models.Model):
             return f"Conversation in {self.confession.name}: {participant_usernames}"
         return f"Conversation: {participant_usernames}"
 
+    @staticmethod
+    def make_participant_key(user_ids, confession_id=None):
+        """Canonical key for a direct conversation between user_ids"""
+        ids = sorted({int(user_id) for user_id in user_ids})
+        return f"{int(confession_id or 0)}:{','.join(str(user_id) for user_id in ids)}"
+
+    @classmethod
+    def get_or_create_direct(cls, user_ids, confession_id=None):
+        """
+        Atomic insert-or-fetch of the direct conversation between user_ids.
+        Concurrent callers collide on the participant_key unique index and
+        the loser fetches the winner's row. Returns (conversation, created).
+        """
+        key = cls.make_participant_key(user_ids, confession_id)
+        with transaction.atomic():
+            conversation, created = cls.objects.get_or_create(
+                participant_key=key,
+                defaults={'confession_id': confession_id or None}
+            )
+            if created:
+                # The confession admin answers on behalf of the confession
+                from confessions.registry import get_confession
+                confession = get_confession(confession_id) if confession_id else None
+                admin_id = confession.admin_id if confession else None
+                member_ids = {int(user_id) for user_id in user_ids}
+                ConversationMember.objects.bulk_create([
+                    ConversationMember(
+                        conversation=conversation,
+                        user_id=user_id,
+                        role='admin' if user_id == admin_id else 'member',
+                        confession_id=conversation.confession_id
+                    )
+                    for user_id in member_ids
+                ])
+                # bulk_create skips signals
+                transaction.on_commit(lambda: invalidate_user_conversations(*member_ids))
+        return conversation, created
+
     def get_unread_count(self, user):
         """Get unread message count for a specific user"""
-        return self.messages.exclude(
-            message_reads__user=user,
-            message_reads__read_at__isnull=False
-        ).exclude(sender=user).count()
+        unread = ConversationMember.objects.filter(
+            conversation=self,
+            user=user
+        ).values_list('unread_count', flat=True).first()
+        return unread or 0
+
+    def record_new_message(self, message):
+        """Update the inbox columns and the other members' unread counters"""
+        self.last_message = message
+        self.last_message_at = message.created_at
+        self.last_message_preview = message.preview_text()
+        Conversation.objects.filter(pk=self.pk).update(
+            last_message=message,
+            last_message_at=self.last_message_at,
+            last_message_preview=self.last_message_preview
+        )
+        ConversationMember.objects.filter(conversation=self).update(
+            **ConversationMember.new_message_updates(message.sender_id, message.created_at)
+        )
+
+    def refresh_last_message(self):
+        """Recompute the inbox columns after the last message is edited or deleted"""
+        last_message = self.messages.filter(is_deleted=False).order_by('-created_at', '-id').first()
+        self.last_message = last_message
+        self.last_message_preview = last_message.preview_text() if last_message else ''
+        Conversation.objects.filter(pk=self.pk).update(
+            last_message=last_message,
+            last_message_preview=self.last_message_preview
+        )
+        last_sender_id = last_message.sender_id if last_message else None
+        ConversationMember.objects.filter(conversation=self).update(
+            awaiting_reply=ConversationMember.awaiting_reply_after(last_sender_id)
+        )
+
+    def recount_unread(self):
+        """Recompute every member's unread counter from their read watermark in one UPDATE"""
+        unread = Message.objects.filter(
+            conversation_id=OuterRef('conversation_id'),
+            id__gt=OuterRef('last_read_message_id')
+        ).exclude(
+            sender_id=OuterRef('user_id')
+        ).values('conversation_id').annotate(total=Count('id')).values('total')
+        ConversationMember.objects.filter(conversation=self).update(
+            unread_count=Coalesce(Subquery(unread), 0)
+        )
+
+    def mark_delivered_up_to(self, user, message_id):
+        """Move the user's delivered pointer forward to message_id"""
+        ConversationMember.objects.filter(
+            conversation=self,
+            user=user,
+            last_delivered_message_id__lt=message_id
+        ).update(last_delivered_message_id=message_id)
+
+    def mark_read_up_to(self, user, message_id):
+        """
+        Move the user's read pointer forward to message_id and recount unread.
+        Returns True if the pointer moved.
+        """
+        unread = self.messages.filter(id__gt=message_id).exclude(sender=user).count()
+        return ConversationMember.objects.filter(
+            conversation=self,
+            user=user,
+            last_read_message_id__lt=message_id
+        ).update(
+            last_read_message_id=message_id,
+            last_delivered_message_id=Greatest('last_delivered_message_id', message_id),
+            unread_count=unread
+        ) > 0
 
     def mark_as_read(self, user):
-        """Mark all messages in conversation as read for a user with retry logic"""
-        unread_messages = self.messages.exclude(sender=user).exclude(
-            message_reads__user=user,
-            message_reads__read_at__isnull=False
+        """
+        Mark every message in the conversation as read for a user.
+        One aggregate and one UPDATE regardless of how many messages are unread.
+        Returns the new read watermark, or None if it did not move.
+        """
+        latest_id = self.messages.aggregate(latest_id=Max('id'))['latest_id']
+        if not latest_id:
+            return None
+
+        updated = ConversationMember.objects.filter(
+            conversation=self,
+            user=user
+        ).filter(
+            Q(last_read_message_id__lt=latest_id) | Q(unread_count__gt=0)
+        ).update(
+            unread_count=0,
+            last_read_message_id=Greatest('last_read_message_id', latest_id),
+            last_delivered_message_id=Greatest('last_delivered_message_id', latest_id)
         )
+        return latest_id if updated else None
+
+
+class ConversationMember(models.Model):
+    """
+    A user's membership in a conversation with per-member inbox state.
+    Reuses the table of the former auto-created participants M2M.
+    Delivered/read receipts are watermarks: every message with an id up to
+    the stored value counts as delivered/read for this member.
+    """
+    ROLE_CHOICES = [
+        ('member', 'Member'),
+        ('admin', 'Admin'),
+    ]
+
+    conversation = models.ForeignKey(
+        Conversation,
+        on_delete=models.CASCADE,
+        related_name='members'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='conversation_memberships'
+    )
+    role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='member')
+    joined_at = models.DateTimeField(default=timezone.now)
+    unread_count = models.PositiveIntegerField(default=0)
+    last_read_message_id = models.PositiveBigIntegerField(default=0)
+    last_delivered_message_id = models.PositiveBigIntegerField(default=0)
+
+    # Inbox filter columns copied from the conversation, so every filter is
+    # one composite index range on (user, ..., last_activity_at)
+    confession = models.ForeignKey(
+        'confessions.Confession',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        db_index=False
+    )
+    last_activity_at = models.DateTimeField(default=timezone.now)
+    # The last message came from someone else: this member owes a reply
+    awaiting_reply = models.BooleanField(default=False)
+
+    class Meta:
+        db_table = 'messaging_conversation_participants'
+        unique_together = ['conversation', 'user']
+        indexes = [
+            models.Index(fields=['user', '-last_activity_at', '-id'], name='member_inbox_idx'),
+            models.Index(fields=['user', 'confession', '-last_activity_at', '-id'], name='member_inbox_confession_idx'),
+            models.Index(fields=['user', 'awaiting_reply', '-last_activity_at', '-id'], name='member_inbox_awaiting_idx'),
+            models.Index(
+                fields=['user', '-last_activity_at', '-id'],
+                condition=Q(unread_count__gt=0),
+                name='member_inbox_unread_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} in conversation {self.conversation_id}"
 
-        # Retry up to 3 times with exponential backoff for database locks
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                # Use atomic transaction to reduce lock time
-                with transaction.atomic():
-                    read_time = timezone.now()
-                    for message in unread_messages:
-                        MessageRead.objects.update_or_create(
-                            message=message,
-                            user=user,
-                            defaults={'read_at': read_time}
-                        )
-                # If successful, break out of retry loop
-                break
-            except OperationalError as e:
-                if 'database is locked' in str(e) and attempt < max_retries - 1:
-                    # Wait with exponential backoff: 0.1s, 0.2s, 0.4s
-                    wait_time = 0.1 * (2 ** attempt)
-                    time.sleep(wait_time)
-                    continue
-                else:
-                    # If last attempt or different error, raise it
-                    raise
+    @staticmethod
+    def awaiting_reply_after(sender_id):
+        """awaiting_reply for every member once sender_id wrote the last message"""
+        if sender_id is None:
+            return Value(False)
+        return Case(When(user_id=sender_id, then=Value(False)), default=Value(True))
+
+    @classmethod
+    def new_message_updates(cls, sender_id, created_at):
+        """UPDATE kwargs applying a new message from sender_id to all members in one statement"""
+        return {
+            'last_activity_at': created_at,
+            'awaiting_reply': cls.awaiting_reply_after(sender_id),
+            'unread_count': Case(
+                When(user_id=sender_id, then=F('unread_count')),
+                default=F('unread_count') + 1
+            ),
+        }
 
 
 class Message(models.Model):
@@ -87,6 +285,11 @@ class Message(models.Model):
     Represents a message in a conversation.
     Supports text, file attachments, edits, pinning, and replies.
     """
+    # The full-text index hangs off this table via raw SQL (migration 0005):
+    # on SQLite, altering or removing a field rebuilds the table and drops the
+    # FTS5 triggers; messaging.search.ensure_search_triggers restores them
+    # after migrate. Renaming content or is_deleted needs a new migration
+    # for the triggers (and the PostgreSQL generated column) as well.
     conversation = models.ForeignKey(
         Conversation,
         on_delete=models.CASCADE,
@@ -137,49 +340,132 @@ class Message(models.Model):
         time_limit = self.created_at + timedelta(minutes=10)
         return timezone.now() <= time_limit
 
+    def preview_text(self):
+        """Short text stored on the conversation for the inbox"""
+        return (self.content or '')[:100]
+
     def mark_as_edited(self):
         """Mark message as edited"""
         self.is_edited = True
         self.edited_at = timezone.now()
         self.save(update_fields=['is_edited', 'edited_at', 'updated_at'])
 
+    def soft_delete(self):
+        """Hide the message, its attachments in the media gallery, and its inbox preview"""
+        self.is_deleted = True
+        self.save(update_fields=['is_deleted'])
+        MessageAttachment.objects.filter(message=self).update(is_deleted=True)
+        if self.conversation.last_message_id == self.id:
+            self.conversation.refresh_last_message()
+
     def get_status_for_user(self, user):
         """
         Get message status for a specific user.
         Returns: 'sent', 'delivered', or 'seen'
         """
-        if self.sender == user:
-            # For sender, check if other participants have read it
-            other_participants = self.conversation.participants.exclude(id=user.id)
-            all_read = all(
-                MessageRead.objects.filter(
-                    message=self,
-                    user=participant,
-                    read_at__isnull=False
-                ).exists()
-                for participant in other_participants
+        if self.sender_id == user.id:
+            # For sender, compare the message id with the other members' watermarks
+            watermarks = ConversationMember.objects.filter(
+                conversation_id=self.conversation_id
+            ).exclude(user_id=user.id).aggregate(
+                min_read=Min('last_read_message_id'),
+                max_delivered=Max('last_delivered_message_id')
+            )
+            return self.status_from_watermarks(
+                self.id, watermarks['min_read'], watermarks['max_delivered']
             )
 
-            if all_read:
-                return 'seen'
+        return 'received'
 
-            # Check if at least delivered (MessageRead record exists)
-            any_delivered = MessageRead.objects.filter(
-                message=self,
-                user__in=other_participants
-            ).exists()
+    REPLY_PREVIEW_LENGTH = 100
 
-            if any_delivered:
-                return 'delivered'
+    @classmethod
+    def resolve_reply_previews(cls, messages):
+        """
+        Compact previews of the messages replied to on a page, {message_id: preview}.
+        One grouped query for the hot tier; the archive is only asked for ids
+        that were not found there.
+        """
+        reply_ids = {message.reply_to_id for message in messages if message.reply_to_id}
+        if not reply_ids:
+            return {}
+
+        previews = {}
+        rows = cls.objects.filter(id__in=reply_ids).annotate(
+            snippet=Substr('content', 1, cls.REPLY_PREVIEW_LENGTH),
+            attachment_count=Count('attachments')
+        ).values('id', 'sender_id', 'sender__username', 'snippet', 'is_deleted', 'attachment_count')
+        for row in rows:
+            previews[row['id']] = cls._reply_preview(
+                row['id'], row['sender_id'], row['sender__username'],
+                row['snippet'], row['is_deleted'], row['attachment_count']
+            )
 
-            return 'sent'
+        missing = reply_ids - previews.keys()
+        if missing:
+            for archived in ArchivedMessage.objects.filter(id__in=missing).select_related('sender'):
+                previews[archived.id] = cls._reply_preview(
+                    archived.id, archived.sender_id, archived.sender.username,
+                    archived.content, archived.is_deleted, 0
+                )
+        return previews
+
+    @classmethod
+    def _reply_preview(cls, message_id, sender_id, username, content, is_deleted, attachment_count):
+        return {
+            'id': message_id,
+            'sender': {'id': sender_id, 'username': username},
+            'content': '' if is_deleted else (content or '')[:cls.REPLY_PREVIEW_LENGTH],
+            'attachment_count': attachment_count,
+            'is_deleted': is_deleted,
+        }
+
+    @classmethod
+    def resolve_statuses(cls, messages, user):
+        """
+        Statuses for a page of messages as seen by user, {message_id: status}.
+        One grouped query over the other members' watermarks for every
+        conversation on the page instead of one per message.
+        """
+        own_messages = [message for message in messages if message.sender_id == user.id]
+        statuses = {message.id: 'received' for message in messages if message.sender_id != user.id}
+        if not own_messages:
+            return statuses
+
+        watermarks = {
+            row['conversation_id']: row
+            for row in ConversationMember.objects.filter(
+                conversation_id__in={message.conversation_id for message in own_messages}
+            ).exclude(user_id=user.id).values('conversation_id').annotate(
+                min_read=Min('last_read_message_id'),
+                max_delivered=Max('last_delivered_message_id')
+            )
+        }
+        for message in own_messages:
+            row = watermarks.get(message.conversation_id, {})
+            statuses[message.id] = cls.status_from_watermarks(
+                message.id, row.get('min_read'), row.get('max_delivered')
+            )
+        return statuses
 
-        return 'received'
+    @staticmethod
+    def status_from_watermarks(message_id, min_read, max_delivered):
+        """
+        Sender-side status from the other members' watermarks.
+        Seen once everyone has read it, delivered once anyone has received it.
+        """
+        if min_read is None or min_read >= message_id:
+            return 'seen'
+        if max_delivered and max_delivered >= message_id:
+            return 'delivered'
+        return 'sent'
 
 
 class MessageRead(models.Model):
     """
-    Tracks read status of messages for each user.
+    Legacy per-message read receipts.
+    Superseded by the ConversationMember watermarks; kept only until
+    `manage.py convert_message_reads` has been run.
     """
     message = models.ForeignKey(
         Message,
@@ -212,6 +498,59 @@ class MessageRead(models.Model):
             self.save(update_fields=['read_at'])
 
 
+class ArchivedMessage(models.Model):
+    """
+    Cold tier for old messages of inactive conversations.
+    Rows keep the original message id so ids stay comparable with the
+    read watermarks and keyset anchors; content is zlib-compressed.
+    Filled by `manage.py archive_messages`, read-only afterwards.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    conversation = models.ForeignKey(
+        Conversation,
+        on_delete=models.CASCADE,
+        related_name='archived_messages'
+    )
+    sender = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_messages'
+    )
+    content_compressed = models.BinaryField(null=True, blank=True)
+    # Plain id: the replied-to message may live in either tier
+    reply_to_id = models.BigIntegerField(null=True, blank=True)
+
+    is_edited = models.BooleanField(default=False)
+    is_pinned = models.BooleanField(default=False)
+    is_deleted = models.BooleanField(default=False)
+
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    edited_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['conversation', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"Archived message {self.id} in conversation {self.conversation_id}"
+
+    @property
+    def content(self):
+        if self.content_compressed is None:
+            return None
+        return zlib.decompress(bytes(self.content_compressed)).decode('utf-8')
+
+    @staticmethod
+    def compress(content):
+        if content is None:
+            return None
+        return zlib.compress(content.encode('utf-8'))
+
+
 class MessageAttachment(models.Model):
     """
     Stores file attachments for messages.
@@ -225,12 +564,25 @@ class MessageAttachment(models.Model):
         ('other', 'Other'),
     ]
 
+    THUMBNAIL_SIZE = (320, 320)
+
     message = models.ForeignKey(
         Message,
         on_delete=models.CASCADE,
         related_name='attachments'
     )
+    # Denormalized from message.conversation so the media gallery is a single index scan
+    conversation = models.ForeignKey(
+        Conversation,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='attachments'
+    )
+    # Denormalized from message.is_deleted (see Message.soft_delete) for the same reason
+    is_deleted = models.BooleanField(default=False)
     file = models.FileField(upload_to='messages/attachments/%Y/%m/%d/')
+    thumbnail = models.ImageField(upload_to='messages/thumbnails/%Y/%m/%d/', blank=True, null=True)
     file_type = models.CharField(max_length=20, choices=FILE_TYPE_CHOICES)
     file_name = models.CharField(max_length=255)
     file_size = models.PositiveIntegerField(help_text='File size in bytes')
@@ -242,11 +594,44 @@ class MessageAttachment(models.Model):
         ordering = ['uploaded_at']
         indexes = [
             models.Index(fields=['message', 'file_type']),
+            models.Index(
+                fields=['conversation', 'file_type', '-uploaded_at', '-id'],
+                condition=Q(is_deleted=False),
+                name='attachment_gallery_type_idx'
+            ),
+            models.Index(
+                fields=['conversation', '-uploaded_at', '-id'],
+                condition=Q(is_deleted=False),
+                name='attachment_gallery_idx'
+            ),
         ]
 
     def __str__(self):
         return f"{self.file_name} ({self.file_type})"
 
+    def save(self, *args, **kwargs):
+        if self.conversation_id is None:
+            self.conversation_id = self.message.conversation_id
+        if self._state.adding and self.file_type == 'image' and not self.thumbnail:
+            self.generate_thumbnail()
+        super().save(*args, **kwargs)
+
+    def generate_thumbnail(self):
+        """Store a small JPEG preview for the gallery; undecodable images just get none"""
+        try:
+            self.file.seek(0)
+            with Image.open(self.file) as image:
+                image = ImageOps.exif_transpose(image)
+                image.thumbnail(self.THUMBNAIL_SIZE)
+                buffer = BytesIO()
+                image.convert('RGB').save(buffer, format='JPEG', quality=80)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            return
+        finally:
+            self.file.seek(0)
+        name = os.path.splitext(os.path.basename(self.file.name))[0]
+        self.thumbnail.save(f'{name}.jpg', ContentFile(buffer.getvalue()), save=False)
+
     @staticmethod
     def determine_file_type(mime_type):
         """Determine file type based on MIME type"""
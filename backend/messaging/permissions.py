@@ -1,5 +1,7 @@
 from rest_framework import permissions
 
+from .membership import get_member_conversation_ids
+
 
 class IsConversationParticipant(permissions.BasePermission):
     """
@@ -8,10 +10,10 @@ class IsConversationParticipant(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         # For conversation objects
         if hasattr(obj, 'participants'):
-            return obj.participants.filter(id=request.user.id).exists()
+            return obj.id in get_member_conversation_ids(request)
         # For message objects
-        elif hasattr(obj, 'conversation'):
-            return obj.conversation.participants.filter(id=request.user.id).exists()
+        elif hasattr(obj, 'conversation_id'):
+            return obj.conversation_id in get_member_conversation_ids(request)
         return False
 
 
@@ -49,6 +51,6 @@ class CanMessageUser(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         # Users can access conversations they're part of
         if hasattr(obj, 'participants'):
-            return obj.participants.filter(id=request.user.id).exists()
+            return obj.id in get_member_conversation_ids(request)
 
         return True
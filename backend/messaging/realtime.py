@@ -0,0 +1,47 @@
+import asyncio
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.utils import timezone
+
+
+def conversation_group_name(conversation_id):
+    """Channel layer group the ChatConsumer joins for a conversation"""
+    return f'chat_{conversation_id}'
+
+
+def broadcast_to_conversation(conversation_id, event):
+    """Send one event to every socket open on a conversation from sync code"""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    async_to_sync(channel_layer.group_send)(conversation_group_name(conversation_id), event)
+
+
+def broadcast_to_conversations(events):
+    """
+    Send {conversation_id: event} in one sync-to-async hop.
+    The group sends run concurrently instead of one blocking round trip each.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None or not events:
+        return
+
+    async def send_all():
+        await asyncio.gather(*(
+            channel_layer.group_send(conversation_group_name(conversation_id), event)
+            for conversation_id, event in events.items()
+        ))
+
+    async_to_sync(send_all)()
+
+
+def broadcast_read_position(conversation_id, user, message_id):
+    """Announce a member's new read watermark; everything up to message_id is read"""
+    broadcast_to_conversation(conversation_id, {
+        'type': 'read_receipt_handler',
+        'message_id': message_id,
+        'user_id': user.id,
+        'username': user.username,
+        'read_at': timezone.now().isoformat()
+    })
@@ -0,0 +1,92 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from confessions.models import Confession
+from .models import ArchivedMessage, Conversation, Message, MessageAttachment, MessageRead
+
+
+def _delete_files(names):
+    for name in names:
+        try:
+            default_storage.delete(name)
+        except OSError:
+            # A missing or locked file must not stop the purge; the rows are already gone
+            pass
+
+
+def purge_confession_messages(confession, batch_size=None, pause=None):
+    """
+    Delete the confession's chat messages older than its retention window.
+
+    Works in batches of at most batch_size messages, each in its own short
+    transaction, sleeping `pause` seconds in between so live chat writes get
+    the SQLite write lock. Attachment files are removed after each commit.
+    Returns the number of messages deleted (both tiers).
+    """
+    batch_size = batch_size or settings.MESSAGE_PURGE_BATCH_SIZE
+    pause = settings.MESSAGE_PURGE_PAUSE if pause is None else pause
+    cutoff = timezone.now() - timedelta(days=confession.message_retention_days)
+    conversations = Conversation.objects.filter(confession=confession)
+
+    deleted = 0
+    affected = set()
+    while True:
+        batch = list(
+            Message.objects.filter(
+                conversation__in=conversations,
+                created_at__lt=cutoff
+            ).order_by('id').values_list('id', 'conversation_id')[:batch_size]
+        )
+        if not batch:
+            break
+
+        message_ids = [message_id for message_id, _ in batch]
+        attachments = MessageAttachment.objects.filter(message_id__in=message_ids)
+        files = [
+            name
+            for file, thumbnail in attachments.values_list('file', 'thumbnail')
+            for name in (file, thumbnail) if name
+        ]
+
+        with transaction.atomic():
+            MessageRead.objects.filter(message_id__in=message_ids).delete()
+            attachments.delete()
+            Message.objects.filter(id__in=message_ids).delete()
+        _delete_files(files)
+
+        deleted += len(batch)
+        affected.update(conversation_id for _, conversation_id in batch)
+        time.sleep(pause)
+
+    while True:
+        archived_ids = list(
+            ArchivedMessage.objects.filter(
+                conversation__in=conversations,
+                created_at__lt=cutoff
+            ).order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not archived_ids:
+            break
+        ArchivedMessage.objects.filter(id__in=archived_ids).delete()
+        deleted += len(archived_ids)
+        time.sleep(pause)
+
+    # Purged rows may have been the inbox preview or still counted as unread
+    for conversation in Conversation.objects.filter(id__in=affected):
+        conversation.refresh_last_message()
+        conversation.recount_unread()
+
+    return deleted
+
+
+def purge_expired_messages(batch_size=None, pause=None):
+    """Apply every confession's retention policy; returns {confession slug: deleted}"""
+    results = {}
+    for confession in Confession.objects.filter(message_retention_days__isnull=False).order_by('id'):
+        results[confession.slug] = purge_confession_messages(confession, batch_size, pause)
+    return results
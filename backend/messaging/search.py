@@ -0,0 +1,171 @@
+"""
+Full-text search over message content.
+
+The index lives outside the Django model state (see migration 0005):
+an FTS5 table kept in sync by triggers on SQLite, a generated tsvector
+column with a GIN index on PostgreSQL. Both drop soft-deleted messages.
+Results are always scoped to conversations the user is a member of.
+Snippets are HTML: message text is escaped and only the <mark> tags
+around matches are markup.
+"""
+from django.db import connection, connections
+from django.utils.html import escape
+
+from .models import Message
+
+SNIPPET_START = '<mark>'
+SNIPPET_END = '</mark>'
+# The database wraps matches in private-use characters; they survive
+# escaping and are swapped for the real tags afterwards
+_MATCH_START = '\ue000'
+_MATCH_END = '\ue001'
+
+
+# Same triggers as migration 0005. SQLite rebuilds messaging_message (and
+# silently drops its triggers) whenever a migration alters or removes one of
+# its fields, so they are re-created after every migrate.
+SQLITE_SEARCH_TRIGGERS = {
+    'messaging_message_fts_insert': """
+        CREATE TRIGGER IF NOT EXISTS messaging_message_fts_insert AFTER INSERT ON messaging_message
+        WHEN new.is_deleted = 0 AND new.content IS NOT NULL
+        BEGIN
+            INSERT INTO messaging_message_fts(rowid, content) VALUES (new.id, new.content);
+        END
+    """,
+    'messaging_message_fts_update': """
+        CREATE TRIGGER IF NOT EXISTS messaging_message_fts_update AFTER UPDATE OF content, is_deleted ON messaging_message
+        BEGIN
+            INSERT INTO messaging_message_fts(messaging_message_fts, rowid, content)
+            SELECT 'delete', old.id, old.content WHERE old.is_deleted = 0 AND old.content IS NOT NULL;
+            INSERT INTO messaging_message_fts(rowid, content)
+            SELECT new.id, new.content WHERE new.is_deleted = 0 AND new.content IS NOT NULL;
+        END
+    """,
+    'messaging_message_fts_delete': """
+        CREATE TRIGGER IF NOT EXISTS messaging_message_fts_delete AFTER DELETE ON messaging_message
+        WHEN old.is_deleted = 0 AND old.content IS NOT NULL
+        BEGIN
+            INSERT INTO messaging_message_fts(messaging_message_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        END
+    """,
+}
+
+
+def ensure_search_triggers(using='default', **kwargs):
+    """
+    post_migrate: restore any FTS5 trigger a table rebuild dropped. Rows
+    written while a trigger was missing never reached the index, so it is
+    refilled from messaging_message whenever one had to be re-created.
+    """
+    db = connections[using]
+    if db.vendor != 'sqlite':
+        return
+    with db.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name FROM sqlite_master WHERE name = 'messaging_message_fts' OR name IN (%s)"
+            % ', '.join(['%s'] * len(SQLITE_SEARCH_TRIGGERS)),
+            list(SQLITE_SEARCH_TRIGGERS)
+        )
+        existing = {name for _, name in cursor.fetchall()}
+        if 'messaging_message_fts' not in existing:
+            # Migration 0005 not applied (yet)
+            return
+        missing = [name for name in SQLITE_SEARCH_TRIGGERS if name not in existing]
+        if not missing:
+            return
+        for name in missing:
+            cursor.execute(SQLITE_SEARCH_TRIGGERS[name])
+        cursor.execute("INSERT INTO messaging_message_fts(messaging_message_fts) VALUES ('delete-all')")
+        cursor.execute(
+            "INSERT INTO messaging_message_fts(rowid, content) "
+            "SELECT id, content FROM messaging_message WHERE is_deleted = 0 AND content IS NOT NULL"
+        )
+
+
+def _render_snippet(snippet):
+    """Escape raw snippet text, then turn the match markers into <mark> tags"""
+    return escape(snippet or '').replace(_MATCH_START, SNIPPET_START).replace(_MATCH_END, SNIPPET_END)
+
+
+def _fts5_query(query):
+    """Quote each term so user input can't use FTS5 syntax; the last term matches as a prefix"""
+    terms = ['"{}"'.format(term.replace('"', '""')) for term in query.split()]
+    if terms:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def _search_sqlite(user_id, query, conversation_id, limit, offset):
+    sql = f"""
+        SELECT m.id,
+               bm25(messaging_message_fts) AS rank,
+               snippet(messaging_message_fts, 0, %s, %s, '…', 12) AS snippet
+        FROM messaging_message_fts
+        JOIN messaging_message m ON m.id = messaging_message_fts.rowid
+        JOIN messaging_conversation_participants cp
+             ON cp.conversation_id = m.conversation_id AND cp.user_id = %s
+        WHERE messaging_message_fts MATCH %s
+        {'AND m.conversation_id = %s' if conversation_id else ''}
+        ORDER BY rank, m.id DESC
+        LIMIT %s OFFSET %s
+    """
+    params = [_MATCH_START, _MATCH_END, user_id, _fts5_query(query)]
+    if conversation_id:
+        params.append(conversation_id)
+    params += [limit, offset]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        # bm25() is lower-is-better; flip it so higher rank means a better match everywhere
+        return [(message_id, -rank, _render_snippet(snippet)) for message_id, rank, snippet in cursor.fetchall()]
+
+
+def _search_postgresql(user_id, query, conversation_id, limit, offset):
+    sql = f"""
+        SELECT m.id,
+               ts_rank(m.search_vector, q) AS rank,
+               ts_headline('simple', m.content, q,
+                           'StartSel=' || %s || ', StopSel=' || %s || ', MaxWords=24, MinWords=8') AS snippet
+        FROM messaging_message m
+        JOIN messaging_conversation_participants cp
+             ON cp.conversation_id = m.conversation_id AND cp.user_id = %s,
+             websearch_to_tsquery('simple', %s) q
+        WHERE m.search_vector @@ q
+        {'AND m.conversation_id = %s' if conversation_id else ''}
+        ORDER BY rank DESC, m.id DESC
+        LIMIT %s OFFSET %s
+    """
+    params = [_MATCH_START, _MATCH_END, user_id, query]
+    if conversation_id:
+        params.append(conversation_id)
+    params += [limit, offset]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [(message_id, rank, _render_snippet(snippet)) for message_id, rank, snippet in cursor.fetchall()]
+
+
+def _search_fallback(user_id, query, conversation_id, limit, offset):
+    queryset = Message.objects.filter(
+        conversation__members__user_id=user_id,
+        is_deleted=False,
+        content__icontains=query
+    ).order_by('-created_at', '-id')
+    if conversation_id:
+        queryset = queryset.filter(conversation_id=conversation_id)
+    return [(message_id, 0.0, escape(content[:100])) for message_id, content in
+            queryset.values_list('id', 'content')[offset:offset + limit]]
+
+
+def search_messages(user, query, conversation_id=None, limit=20, offset=0):
+    """
+    Ranked matches for query in the user's conversations.
+    Returns [(message_id, rank, snippet)], best match first.
+    """
+    query = (query or '').strip()
+    if not query:
+        return []
+
+    search = {
+        'sqlite': _search_sqlite,
+        'postgresql': _search_postgresql,
+    }.get(connection.vendor, _search_fallback)
+    return search(user.id, query, conversation_id, limit, offset)
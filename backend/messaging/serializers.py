@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import Conversation, Message, MessageRead, MessageAttachment
+from .models import ArchivedMessage, Conversation, Message, MessageAttachment
 from accounts.serializers import UserSerializer
 
 User = get_user_model()
@@ -11,8 +11,8 @@ class MessageAttachmentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = MessageAttachment
-        fields = ['id', 'file', 'file_type', 'file_name', 'file_size', 'mime_type', 'uploaded_at']
-        read_only_fields = ['id', 'file_type', 'file_name', 'file_size', 'mime_type', 'uploaded_at']
+        fields = ['id', 'file', 'thumbnail', 'file_type', 'file_name', 'file_size', 'mime_type', 'uploaded_at']
+        read_only_fields = ['id', 'thumbnail', 'file_type', 'file_name', 'file_size', 'mime_type', 'uploaded_at']
 
     def create(self, validated_data):
         # Auto-detect file type, name, size, and mime type
@@ -26,33 +26,11 @@ class MessageAttachmentSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class MessageReadSerializer(serializers.ModelSerializer):
-    """Serializer for message read status"""
-    user = UserSerializer(read_only=True)
-
-    class Meta:
-        model = MessageRead
-        fields = ['id', 'user', 'delivered_at', 'read_at']
-        read_only_fields = ['id', 'delivered_at', 'read_at']
-
-
-class ReplyToMessageSerializer(serializers.ModelSerializer):
-    """Simplified serializer for reply_to messages (to avoid deep nesting)"""
-    sender = UserSerializer(read_only=True)
-    attachments = MessageAttachmentSerializer(many=True, read_only=True)
-
-    class Meta:
-        model = Message
-        fields = ['id', 'sender', 'content', 'attachments', 'created_at', 'is_deleted']
-        read_only_fields = ['id', 'sender', 'created_at', 'is_deleted']
-
-
 class MessageSerializer(serializers.ModelSerializer):
     """Serializer for messages"""
     sender = UserSerializer(read_only=True)
     attachments = MessageAttachmentSerializer(many=True, read_only=True)
-    message_reads = MessageReadSerializer(many=True, read_only=True)
-    reply_to = ReplyToMessageSerializer(read_only=True)
+    reply_to = serializers.SerializerMethodField()
     status = serializers.SerializerMethodField()
     can_edit = serializers.SerializerMethodField()
     attachment_files = serializers.ListField(
@@ -66,16 +44,28 @@ class MessageSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'conversation', 'sender', 'content', 'reply_to',
             'is_edited', 'is_pinned', 'is_deleted', 'created_at',
-            'updated_at', 'edited_at', 'attachments', 'message_reads',
-            'status', 'can_edit', 'attachment_files'
+            'updated_at', 'edited_at', 'attachments', 'status',
+            'can_edit', 'attachment_files'
         ]
         read_only_fields = [
             'id', 'sender', 'is_edited', 'edited_at', 'created_at',
-            'updated_at', 'message_reads', 'status', 'can_edit'
+            'updated_at', 'status', 'can_edit'
         ]
 
+    def get_reply_to(self, obj):
+        """Compact preview of the replied-to message, batched per page via context"""
+        if not obj.reply_to_id:
+            return None
+        previews = self.context.get('reply_previews')
+        if previews is None:
+            previews = Message.resolve_reply_previews([obj])
+        return previews.get(obj.reply_to_id)
+
     def get_status(self, obj):
         """Get message status for the requesting user"""
+        statuses = self.context.get('message_statuses')
+        if statuses is not None and obj.id in statuses:
+            return statuses[obj.id]
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.get_status_for_user(request.user)
@@ -100,6 +90,7 @@ class MessageSerializer(serializers.ModelSerializer):
         for file_obj in attachment_files:
             MessageAttachment.objects.create(
                 message=message,
+                conversation_id=message.conversation_id,
                 file=file_obj,
                 file_name=file_obj.name,
                 file_size=file_obj.size,
@@ -109,16 +100,8 @@ class MessageSerializer(serializers.ModelSerializer):
                 )
             )
 
-        # Create MessageRead records for other participants
-        conversation = message.conversation
-        other_participants = conversation.participants.exclude(id=request.user.id)
-        for participant in other_participants:
-            MessageRead.objects.create(message=message, user=participant)
-
-        # Update conversation's last_message_at
-        from django.utils import timezone
-        conversation.last_message_at = timezone.now()
-        conversation.save(update_fields=['last_message_at'])
+        # Update the inbox columns and unread counters
+        message.conversation.record_new_message(message)
 
         return message
 
@@ -134,6 +117,8 @@ class MessageSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError("Message can only be edited within 10 minutes of creation")
             instance.content = validated_data['content']
             instance.mark_as_edited()
+            if instance.conversation.last_message_id == instance.id:
+                instance.conversation.refresh_last_message()
 
         # Allow pinning/unpinning
         if 'is_pinned' in validated_data:
@@ -143,6 +128,50 @@ class MessageSerializer(serializers.ModelSerializer):
         return instance
 
 
+class ArchivedMessageSerializer(serializers.ModelSerializer):
+    """
+    Archived messages in the same shape as MessageSerializer output.
+    The archive is read-only: no attachments, never editable.
+    """
+    sender = UserSerializer(read_only=True)
+    content = serializers.CharField(read_only=True)
+    reply_to = serializers.SerializerMethodField()
+    attachments = serializers.SerializerMethodField()
+    status = serializers.SerializerMethodField()
+    can_edit = serializers.SerializerMethodField()
+    is_archived = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ArchivedMessage
+        fields = [
+            'id', 'conversation', 'sender', 'content', 'reply_to', 'reply_to_id',
+            'is_edited', 'is_pinned', 'is_deleted', 'created_at',
+            'updated_at', 'edited_at', 'attachments', 'status', 'can_edit',
+            'is_archived'
+        ]
+        read_only_fields = fields
+
+    def get_reply_to(self, obj):
+        if not obj.reply_to_id:
+            return None
+        previews = self.context.get('reply_previews')
+        if previews is None:
+            previews = Message.resolve_reply_previews([obj])
+        return previews.get(obj.reply_to_id)
+
+    def get_attachments(self, obj):
+        return []
+
+    def get_status(self, obj):
+        return (self.context.get('message_statuses') or {}).get(obj.id, 'sent')
+
+    def get_can_edit(self, obj):
+        return False
+
+    def get_is_archived(self, obj):
+        return True
+
+
 class ConversationSerializer(serializers.ModelSerializer):
     """Serializer for conversations"""
     participants = UserSerializer(many=True, read_only=True)
@@ -165,9 +194,8 @@ class ConversationSerializer(serializers.ModelSerializer):
 
     def get_last_message(self, obj):
         """Get the last message in the conversation"""
-        last_message = obj.messages.filter(is_deleted=False).last()
-        if last_message:
-            return MessageSerializer(last_message, context=self.context).data
+        if obj.last_message:
+            return MessageSerializer(obj.last_message, context=self.context).data
         return None
 
     def get_unread_count(self, obj):
@@ -184,13 +212,19 @@ class ConversationSerializer(serializers.ModelSerializer):
         # Create conversation
         conversation = Conversation.objects.create(**validated_data)
 
-        # Add requesting user as a participant
-        conversation.participants.add(request.user)
+        # Add requesting user as a participant; the creator manages the conversation
+        conversation.participants.add(
+            request.user,
+            through_defaults={'role': 'admin', 'confession_id': conversation.confession_id}
+        )
 
         # Add other participants
         if participant_ids:
-            participants = User.objects.filter(id__in=participant_ids)
-            conversation.participants.add(*participants)
+            participants = User.objects.filter(id__in=participant_ids).exclude(id=request.user.id)
+            conversation.participants.add(
+                *participants,
+                through_defaults={'confession_id': conversation.confession_id}
+            )
 
         return conversation
 
@@ -210,16 +244,18 @@ class ConversationListSerializer(serializers.ModelSerializer):
 
     def get_unread_count(self, obj):
         """Get unread message count for the requesting user"""
+        if hasattr(obj, 'member_unread_count'):
+            return obj.member_unread_count
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.get_unread_count(request.user)
         return 0
 
     def get_last_message_preview(self, obj):
-        """Get a preview of the last message"""
-        last_message = obj.messages.filter(is_deleted=False).last()
+        """Get a preview of the last message from the denormalized columns"""
+        last_message = obj.last_message
         if last_message:
-            content = last_message.content if last_message.content else '[Attachment]'
+            content = obj.last_message_preview or '[Attachment]'
             return {
                 'id': last_message.id,
                 'sender': last_message.sender.username,
@@ -0,0 +1,33 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .membership import invalidate_user_conversations
+from .models import Conversation, ConversationMember
+
+
+@receiver(post_save, sender=ConversationMember)
+def membership_created(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: invalidate_user_conversations(instance.user_id))
+
+
+@receiver(post_delete, sender=ConversationMember)
+def membership_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_user_conversations(instance.user_id))
+
+
+@receiver(m2m_changed, sender=Conversation.participants.through)
+def participants_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """participants.add()/remove()/clear() write the through table without per-row signals"""
+    if action in ('post_add', 'post_remove'):
+        user_ids = [instance.pk] if reverse else pk_set
+    elif action == 'pre_clear':
+        if reverse:
+            user_ids = [instance.pk]
+        else:
+            user_ids = list(instance.members.values_list('user_id', flat=True))
+    else:
+        return
+    user_ids = list(user_ids)
+    transaction.on_commit(lambda: invalidate_user_conversations(*user_ids))
@@ -2,22 +2,44 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q, Max
+from django.db.models import F, Q, Sum
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
 
-from .models import Conversation, Message, MessageRead, MessageAttachment
+from .models import ArchivedMessage, Conversation, ConversationMember, Message, MessageAttachment
 from .serializers import (
     ConversationSerializer,
     ConversationListSerializer,
     MessageSerializer,
+    ArchivedMessageSerializer,
     MessageAttachmentSerializer
 )
 from .permissions import IsConversationParticipant, IsMessageSender, CanMessageUser
-from confessions.models import Confession
+from .broadcast import broadcast_message
+from .membership import get_member_conversation_ids, is_conversation_member
+from .realtime import broadcast_read_position
+from .search import search_messages
+from confessions.registry import get_confession, is_confession_admin
+from core.pagination import AnchoredKeysetPagination, KeysetPagination
+from confessions.utils import get_user_subscription_ids
 
 User = get_user_model()
 
 
+class MediaGalleryPagination(KeysetPagination):
+    """Conversation media, newest upload first"""
+    ordering_field = 'uploaded_at'
+    page_size = 30
+    max_page_size = 100
+
+
+class InboxPagination(KeysetPagination):
+    """Membership rows, most recent activity first"""
+    ordering_field = 'last_activity_at'
+    page_size = 30
+    max_page_size = 100
+
+
 class ConversationViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing conversations.
@@ -28,13 +50,14 @@ class ConversationViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Get conversations where user is a participant"""
         return Conversation.objects.filter(
-            participants=self.request.user
-        ).prefetch_related(
-            'participants',
-            'messages'
+            members__user=self.request.user
         ).annotate(
-            last_msg_time=Max('messages__created_at')
-        ).order_by('-last_msg_time', '-updated_at')
+            member_unread_count=F('members__unread_count')
+        ).select_related(
+            'last_message__sender'
+        ).prefetch_related(
+            'participants'
+        ).order_by(F('last_message_at').desc(nulls_last=True), '-updated_at')
 
     def get_serializer_class(self):
         """Use simplified serializer for list view"""
@@ -42,13 +65,46 @@ class ConversationViewSet(viewsets.ModelViewSet):
             return ConversationListSerializer
         return ConversationSerializer
 
+    def _resolve_confession(self, confession_id):
+        """
+        Registry entry for an optional confession id, for every role.
+        Returns (entry or None, error_response): 400 for a malformed id, 404 for an unknown one.
+        """
+        if confession_id in (None, ''):
+            return None, None
+        try:
+            confession_id = int(confession_id)
+        except (TypeError, ValueError):
+            return None, Response(
+                {'error': 'Invalid confession id.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        confession = get_confession(confession_id)
+        if confession is None:
+            return None, Response(
+                {'error': 'Confession not found.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return confession, None
+
     def create(self, request, *args, **kwargs):
         """
         Create a new conversation.
         Validates permissions based on user role and subscription.
         """
         participant_ids = request.data.get('participant_ids', [])
-        confession_id = request.data.get('confession')
+        confession, error = self._resolve_confession(request.data.get('confession'))
+        if error:
+            return error
+        confession_id = confession.id if confession else None
+        if len(participant_ids) == 1:
+            try:
+                participant_ids = [int(participant_ids[0])]
+            except (TypeError, ValueError):
+                return Response(
+                    {'error': 'Invalid participant id.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
         # Validate permissions for regular users
         if request.user.role == 'user':
@@ -68,39 +124,35 @@ class ConversationViewSet(viewsets.ModelViewSet):
                 )
 
             # If confession is specified, check if user is subscribed
-            if confession_id:
-                try:
-                    confession = Confession.objects.get(id=confession_id)
-                    if not confession.subscribers.filter(user=request.user).exists():
-                        return Response(
-                            {'error': 'You must be subscribed to this confession to message its admin.'},
-                            status=status.HTTP_403_FORBIDDEN
-                        )
-
-                    # Check if target user is the admin of this confession
-                    if confession.admin != target_user:
-                        return Response(
-                            {'error': 'The selected user is not the admin of this confession.'},
-                            status=status.HTTP_403_FORBIDDEN
-                        )
-                except Confession.DoesNotExist:
+            if confession:
+                if confession.id not in get_user_subscription_ids(request.user.id):
                     return Response(
-                        {'error': 'Confession not found.'},
-                        status=status.HTTP_404_NOT_FOUND
+                        {'error': 'You must be subscribed to this confession to message its admin.'},
+                        status=status.HTTP_403_FORBIDDEN
                     )
 
-            # Check if conversation already exists
-            existing_conversation = Conversation.objects.filter(
-                participants=request.user
-            ).filter(
-                participants__id=target_user.id
-            ).filter(confession_id=confession_id).first()
+                # Check if target user is the admin of this confession
+                if confession.admin_id != target_user.id:
+                    return Response(
+                        {'error': 'The selected user is not the admin of this confession.'},
+                        status=status.HTTP_403_FORBIDDEN
+                    )
 
-            if existing_conversation:
+        # Direct conversations are keyed by their participants: fetch the existing one or insert it atomically
+        if len(participant_ids) == 1:
+            if not User.objects.filter(id=participant_ids[0]).exists():
                 return Response(
-                    ConversationSerializer(existing_conversation, context={'request': request}).data,
-                    status=status.HTTP_200_OK
+                    {'error': 'User not found.'},
+                    status=status.HTTP_404_NOT_FOUND
                 )
+            conversation, created = Conversation.get_or_create_direct(
+                [request.user.id, participant_ids[0]],
+                confession_id
+            )
+            return Response(
+                ConversationSerializer(conversation, context={'request': request}).data,
+                status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+            )
 
         return super().create(request, *args, **kwargs)
 
@@ -108,14 +160,145 @@ class ConversationViewSet(viewsets.ModelViewSet):
     def mark_as_read(self, request, pk=None):
         """Mark all messages in conversation as read"""
         conversation = self.get_object()
-        conversation.mark_as_read(request.user)
+        read_up_to = conversation.mark_as_read(request.user)
+        if read_up_to:
+            broadcast_read_position(conversation.id, request.user, read_up_to)
         return Response({'status': 'Messages marked as read'})
 
+    @action(detail=False, methods=['post'])
+    def broadcast(self, request):
+        """
+        Post one announcement into every conversation the confession admin has
+        for that confession (confession admin or superadmin only).
+        """
+        confession_id = request.data.get('confession_id')
+        content = (request.data.get('content') or '').strip()
+
+        if not confession_id or not content:
+            return Response(
+                {'error': 'confession_id and content are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        confession = get_confession(confession_id)
+        if confession is None:
+            return Response(
+                {'error': 'Confession not found.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        if not is_confession_admin(request.user, confession.id) and request.user.role != 'superadmin':
+            return Response(
+                {'error': 'Only the confession admin can broadcast.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        conversation_ids = ConversationMember.objects.filter(
+            user=request.user,
+            conversation__confession_id=confession.id
+        ).values_list('conversation_id', flat=True)
+        sent = broadcast_message(
+            request.user,
+            list(conversation_ids),
+            content,
+            serializer_context=self.get_serializer_context()
+        )
+
+        return Response({'sent': sent})
+
+    @action(detail=True, methods=['get'])
+    def media(self, request, pk=None):
+        """Shared files and photos, newest first; ?type=image|video|audio|document|other"""
+        if not is_conversation_member(request.user.id, pk):
+            return Response(
+                {'error': 'Conversation not found.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        attachments = MessageAttachment.objects.filter(
+            conversation_id=pk,
+            is_deleted=False
+        )
+        file_type = request.query_params.get('type')
+        if file_type:
+            if file_type not in dict(MessageAttachment.FILE_TYPE_CHOICES):
+                return Response(
+                    {'error': 'Unknown file type.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            attachments = attachments.filter(file_type=file_type)
+
+        rows = attachments.values(
+            'id', 'message_id', 'file', 'thumbnail', 'file_type', 'file_name',
+            'file_size', 'mime_type', 'uploaded_at'
+        )
+        paginator = MediaGalleryPagination()
+        page = paginator.paginate_queryset(rows, request, view=self)
+        return paginator.get_paginated_response([
+            {
+                'id': row['id'],
+                'message': row['message_id'],
+                'file': default_storage.url(row['file']),
+                'thumbnail': default_storage.url(row['thumbnail']) if row['thumbnail'] else None,
+                'file_type': row['file_type'],
+                'file_name': row['file_name'],
+                'file_size': row['file_size'],
+                'mime_type': row['mime_type'],
+                'uploaded_at': row['uploaded_at'],
+            }
+            for row in page
+        ])
+
+    @action(detail=False, methods=['get'])
+    def inbox(self, request):
+        """
+        Filtered inbox: ?confession=<id>&unread=1&awaiting_reply=1
+        Filters run on the user's membership rows, each backed by a
+        (user, ..., last_activity_at) index, then the page is loaded in one query.
+        """
+        members = ConversationMember.objects.filter(user=request.user)
+
+        confession_id = request.query_params.get('confession')
+        if confession_id:
+            try:
+                members = members.filter(confession_id=int(confession_id))
+            except ValueError:
+                return Response(
+                    {'error': 'Invalid confession.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        if request.query_params.get('unread') in ('1', 'true'):
+            members = members.filter(unread_count__gt=0)
+        if request.query_params.get('awaiting_reply') in ('1', 'true'):
+            members = members.filter(awaiting_reply=True)
+
+        paginator = InboxPagination()
+        page = paginator.paginate_queryset(
+            members.values('id', 'conversation_id', 'last_activity_at', 'unread_count', 'awaiting_reply'),
+            request,
+            view=self
+        )
+
+        conversations = Conversation.objects.filter(
+            id__in=[row['conversation_id'] for row in page]
+        ).select_related('last_message__sender').prefetch_related('participants').in_bulk()
+        ordered = []
+        for row in page:
+            conversation = conversations[row['conversation_id']]
+            conversation.member_unread_count = row['unread_count']
+            ordered.append(conversation)
+        results = ConversationListSerializer(ordered, many=True, context={'request': request}).data
+        for data, row in zip(results, page):
+            data['awaiting_reply'] = row['awaiting_reply']
+            data['last_activity_at'] = row['last_activity_at']
+        return paginator.get_paginated_response(results)
+
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
         """Get total unread message count across all conversations"""
-        conversations = self.get_queryset()
-        total_unread = sum(conv.get_unread_count(request.user) for conv in conversations)
+        # One aggregate over the user's membership rows, however many conversations they have
+        total_unread = ConversationMember.objects.filter(
+            user=request.user
+        ).aggregate(total=Sum('unread_count'))['total'] or 0
         return Response({'unread_count': total_unread})
 
     @action(detail=False, methods=['post'])
@@ -125,13 +308,24 @@ class ConversationViewSet(viewsets.ModelViewSet):
         Used by frontend to start a new conversation.
         """
         target_user_id = request.data.get('target_user_id')
-        confession_id = request.data.get('confession_id')
 
         if not target_user_id:
             return Response(
                 {'error': 'target_user_id is required'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        try:
+            target_user_id = int(target_user_id)
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'Invalid target_user_id.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        confession, error = self._resolve_confession(request.data.get('confession_id'))
+        if error:
+            return error
+        confession_id = confession.id if confession else None
 
         # Validate permissions (same logic as create)
         if request.user.role == 'user':
@@ -142,50 +336,49 @@ class ConversationViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_403_FORBIDDEN
                 )
 
-            if confession_id:
-                try:
-                    confession = Confession.objects.get(id=confession_id)
-                    if not confession.subscribers.filter(user=request.user).exists():
-                        return Response(
-                            {'error': 'You must be subscribed to this confession.'},
-                            status=status.HTTP_403_FORBIDDEN
-                        )
-                    if confession.admin.id != target_user_id:
-                        return Response(
-                            {'error': 'User is not the admin of this confession.'},
-                            status=status.HTTP_403_FORBIDDEN
-                        )
-                except Confession.DoesNotExist:
+            if confession:
+                if confession.id not in get_user_subscription_ids(request.user.id):
                     return Response(
-                        {'error': 'Confession not found.'},
-                        status=status.HTTP_404_NOT_FOUND
+                        {'error': 'You must be subscribed to this confession.'},
+                        status=status.HTTP_403_FORBIDDEN
+                    )
+                if confession.admin_id != target_user.id:
+                    return Response(
+                        {'error': 'User is not the admin of this confession.'},
+                        status=status.HTTP_403_FORBIDDEN
                     )
 
-        # Find or create conversation
-        conversation = Conversation.objects.filter(
-            participants=request.user
-        ).filter(
-            participants__id=target_user_id
-        ).filter(confession_id=confession_id).first()
-
-        if not conversation:
-            # Create new conversation
-            conversation = Conversation.objects.create(
-                confession_id=confession_id
+        if not User.objects.filter(id=target_user_id).exists():
+            return Response(
+                {'error': 'User not found.'},
+                status=status.HTTP_404_NOT_FOUND
             )
-            conversation.participants.add(request.user, target_user_id)
+
+        # Find or create conversation with a single probe of the participant_key index
+        conversation, created = Conversation.get_or_create_direct(
+            [request.user.id, target_user_id],
+            confession_id
+        )
 
         return Response(
             ConversationSerializer(conversation, context={'request': request}).data
         )
 
 
+class MessageHistoryPagination(AnchoredKeysetPagination):
+    """Newest page first; ?before=<id> loads older history, ?after=<id> catches up"""
+    ordering_field = 'created_at'
+    page_size = 50
+    max_page_size = 100
+
+
 class MessageViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing messages.
     """
     permission_classes = [IsAuthenticated, IsConversationParticipant]
     serializer_class = MessageSerializer
+    pagination_class = MessageHistoryPagination
 
     def get_queryset(self):
         """Get messages in conversations where user is a participant"""
@@ -195,11 +388,9 @@ class MessageViewSet(viewsets.ModelViewSet):
             conversation__participants=self.request.user
         ).select_related(
             'sender',
-            'conversation',
-            'reply_to'
+            'conversation'
         ).prefetch_related(
-            'attachments',
-            'message_reads'
+            'attachments'
         )
 
         if conversation_id:
@@ -210,14 +401,67 @@ class MessageViewSet(viewsets.ModelViewSet):
             Q(is_deleted=False) | Q(sender=self.request.user)
         )
 
-        return queryset.order_by('created_at')
+        return queryset.order_by('created_at', 'id')
+
+    def get_archived_queryset(self):
+        """Archive tier for the requested conversation, or None when it has nothing archived"""
+        conversation_id = self.request.query_params.get('conversation')
+        if not conversation_id:
+            return None
+        if not Conversation.objects.filter(
+            id=conversation_id,
+            members__user=self.request.user,
+            has_archived_messages=True
+        ).exists():
+            return None
+
+        return ArchivedMessage.objects.filter(
+            conversation_id=conversation_id
+        ).filter(
+            Q(is_deleted=False) | Q(sender=self.request.user)
+        ).select_related('sender')
+
+    def list(self, request, *args, **kwargs):
+        """List messages and advance the reader's delivered watermark"""
+        querysets = [self.filter_queryset(self.get_queryset())]
+        archived = self.get_archived_queryset()
+        if archived is not None:
+            querysets.append(archived)
+        page = self.paginator.paginate_querysets(querysets, request, view=self)
+
+        # Resolve every status on the page at once instead of per message
+        context = self.get_serializer_context()
+        context['message_statuses'] = Message.resolve_statuses(page, request.user)
+        context['reply_previews'] = Message.resolve_reply_previews(page)
+        data = [
+            (ArchivedMessageSerializer if isinstance(message, ArchivedMessage) else MessageSerializer)(
+                message, context=context
+            ).data
+            for message in page
+        ]
+        response = self.get_paginated_response(data)
+
+        conversation_id = request.query_params.get('conversation')
+        if conversation_id and is_conversation_member(request.user.id, conversation_id):
+            # Per-member read watermarks, so clients can derive 'seen' from
+            # their minimum as later read receipts arrive
+            response.data['read_positions'] = dict(
+                ConversationMember.objects.filter(
+                    conversation_id=conversation_id
+                ).values_list('user_id', 'last_read_message_id')
+            )
+        latest_id = max((message.id for message in page), default=0)
+        if conversation_id and latest_id:
+            Conversation(pk=conversation_id).mark_delivered_up_to(request.user, latest_id)
+
+        return response
 
     def perform_create(self, serializer):
         """Create a new message"""
         conversation = serializer.validated_data.get('conversation')
 
         # Verify user is participant
-        if not conversation.participants.filter(id=self.request.user.id).exists():
+        if conversation.id not in get_member_conversation_ids(self.request):
             raise PermissionError('You are not a participant in this conversation')
 
         serializer.save(sender=self.request.user)
@@ -243,8 +487,8 @@ class MessageViewSet(viewsets.ModelViewSet):
         # Check if user is admin or owner for pinning
         if 'is_pinned' in request.data:
             is_owner = message.sender == request.user
-            is_admin = (message.conversation.confession and
-                       (message.conversation.confession.admin == request.user or request.user.role == 'superadmin'))
+            is_admin = (message.conversation.confession_id and
+                        (is_confession_admin(request.user, message.conversation.confession_id) or request.user.role == 'superadmin'))
 
             if not is_owner and not is_admin:
                 return Response(
@@ -271,25 +515,67 @@ class MessageViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        # Soft delete
-        message.is_deleted = True
-        message.save(update_fields=['is_deleted'])
+        message.soft_delete()
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    search_page_size = 20
+    search_max_page_size = 50
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Full-text search in the user's conversations, best match first"""
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {'error': 'q is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            page = max(1, int(request.query_params.get('page', 1)))
+            page_size = max(1, min(int(request.query_params.get('page_size', self.search_page_size)),
+                                   self.search_max_page_size))
+            conversation_id = int(request.query_params['conversation']) if request.query_params.get('conversation') else None
+        except ValueError:
+            return Response(
+                {'error': 'page, page_size and conversation must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Fetch one extra row to know whether another page exists
+        matches = search_messages(
+            request.user, query, conversation_id,
+            limit=page_size + 1, offset=(page - 1) * page_size
+        )
+        has_next = len(matches) > page_size
+        matches = matches[:page_size]
+
+        messages = Message.objects.select_related('sender').in_bulk([message_id for message_id, _, _ in matches])
+        results = []
+        for message_id, rank, snippet in matches:
+            message = messages.get(message_id)
+            if message is None:
+                continue
+            results.append({
+                'id': message.id,
+                'conversation': message.conversation_id,
+                'sender': {'id': message.sender_id, 'username': message.sender.username},
+                'created_at': message.created_at,
+                'snippet': snippet,
+                'rank': rank,
+            })
+
+        return Response({
+            'next_page': page + 1 if has_next else None,
+            'results': results
+        })
+
     @action(detail=True, methods=['post'])
     def mark_as_read(self, request, pk=None):
         """Mark a specific message as read"""
         message = self.get_object()
-
-        # Get or create MessageRead for this user
-        message_read, created = MessageRead.objects.get_or_create(
-            message=message,
-            user=request.user
-        )
-
-        if not message_read.read_at:
-            message_read.mark_as_read()
+        message.conversation.mark_read_up_to(request.user, message.id)
 
         return Response({'status': 'Message marked as read'})
 
@@ -300,8 +586,8 @@ class MessageViewSet(viewsets.ModelViewSet):
 
         # Check permissions: owner can always pin, or confession admin can pin
         is_owner = message.sender == request.user
-        is_admin = (message.conversation.confession and
-                   (message.conversation.confession.admin == request.user or request.user.role == 'superadmin'))
+        is_admin = (message.conversation.confession_id and
+                    (is_confession_admin(request.user, message.conversation.confession_id) or request.user.role == 'superadmin'))
 
         if not is_owner and not is_admin:
             return Response(
@@ -327,8 +613,8 @@ class MessageViewSet(viewsets.ModelViewSet):
 
         # Check permissions: owner can always unpin, or confession admin can unpin
         is_owner = message.sender == request.user
-        is_admin = (message.conversation.confession and
-                   (message.conversation.confession.admin == request.user or request.user.role == 'superadmin'))
+        is_admin = (message.conversation.confession_id and
+                    (is_confession_admin(request.user, message.conversation.confession_id) or request.user.role == 'superadmin'))
 
         if not is_owner and not is_admin:
             return Response(
@@ -82,6 +82,23 @@ CHANNEL_LAYERS = {
 #     },
 # }
 
+# Cache: per-process memory in development; set CACHE_REDIS_URL in production
+# so every web and worker process sees the same invalidations
+CACHE_REDIS_URL = config('CACHE_REDIS_URL', default='')
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
@@ -136,6 +153,20 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
 }
 
+# Subscriber fan-out (see confessions/fanout.py)
+FANOUT_BATCH_SIZE = config('FANOUT_BATCH_SIZE', default=1000, cast=int)
+# A running job whose lock is older than this is treated as abandoned
+FANOUT_LOCK_TIMEOUT = config('FANOUT_LOCK_TIMEOUT', default=300, cast=int)
+# Seconds a process may serve its confession registry copy (admin ids used
+# for authorization) before reloading it, even without a version bump
+CONFESSION_REGISTRY_MAX_AGE = config('CONFESSION_REGISTRY_MAX_AGE', default=30, cast=int)
+# Same bound for each user's cached subscription set (may they message a
+# confession admin, feed filters); invalidation only reaches other
+# processes when the cache is shared
+SUBSCRIPTION_CACHE_TIMEOUT = config('SUBSCRIPTION_CACHE_TIMEOUT', default=30, cast=int)
+# Seconds a cached notification filter may lag behind a preference change
+NOTIFICATION_PREFERENCE_CACHE_TIMEOUT = config('NOTIFICATION_PREFERENCE_CACHE_TIMEOUT', default=60, cast=int)
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
@@ -164,4 +195,25 @@ CORS_ALLOW_CREDENTIALS = True
 
 EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@religionplatform.com')
-EMAIL_SUBJECT_PREFIX = '[Religion Platform] '
\ No newline at end of file
+EMAIL_SUBJECT_PREFIX = '[Religion Platform] '
+
+# Email queue worker (python manage.py send_queued_emails --loop)
+EMAIL_BATCH_SIZE = config('EMAIL_BATCH_SIZE', default=100, cast=int)
+EMAIL_MAX_ATTEMPTS = config('EMAIL_MAX_ATTEMPTS', default=3, cast=int)
+# Seconds before the first retry; doubled after every further failure
+EMAIL_RETRY_BACKOFF = config('EMAIL_RETRY_BACKOFF', default=60, cast=int)
+# A row left in 'sending' longer than this (crashed worker) is claimed again
+EMAIL_LOCK_TIMEOUT = config('EMAIL_LOCK_TIMEOUT', default=300, cast=int)
+# Seconds a user's cached conversation membership (chat and message access
+# checks) may lag behind a removal when invalidation misses another process
+CONVERSATION_MEMBERSHIP_CACHE_TIMEOUT = config('CONVERSATION_MEMBERSHIP_CACHE_TIMEOUT', default=30, cast=int)
+# Cold message archive (python manage.py archive_messages)
+MESSAGE_ARCHIVE_AFTER_MONTHS = config('MESSAGE_ARCHIVE_AFTER_MONTHS', default=6, cast=int)
+MESSAGE_ARCHIVE_BATCH_SIZE = config('MESSAGE_ARCHIVE_BATCH_SIZE', default=1000, cast=int)
+
+# Chat retention purge (python manage.py purge_expired_messages)
+MESSAGE_PURGE_BATCH_SIZE = config('MESSAGE_PURGE_BATCH_SIZE', default=500, cast=int)
+MESSAGE_PURGE_PAUSE = config('MESSAGE_PURGE_PAUSE', default=0.5, cast=float)
+
+# Admin broadcast announcements (messaging/broadcast.py)
+MESSAGE_BROADCAST_BATCH_SIZE = config('MESSAGE_BROADCAST_BATCH_SIZE', default=500, cast=int)
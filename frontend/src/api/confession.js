@@ -34,8 +34,8 @@ export const confessionAPI = {
     return response.data
   },
 
-  getFollowers: async (slug) => {
-    const response = await api.get(`/confessions/${slug}/followers/`)
+  getFollowers: async (slug, params) => {
+    const response = await api.get(`/confessions/${slug}/followers/`, { params })
     return response.data
   },
 
@@ -16,6 +16,18 @@ const messagingAPI = {
     return response.data;
   },
 
+  // params: { type, cursor } - type is image|video|audio|document|other
+  getConversationMedia: async (conversationId, params = {}) => {
+    const response = await api.get(`/messaging/conversations/${conversationId}/media/`, { params });
+    return response.data;
+  },
+
+  // params: { confession, unread, awaiting_reply, cursor } - admin inbox filters
+  getInbox: async (params = {}) => {
+    const response = await api.get('/messaging/conversations/inbox/', { params });
+    return response.data;
+  },
+
   createConversation: async (data) => {
     const response = await api.post('/messaging/conversations/', data);
     return response.data;
@@ -40,11 +52,12 @@ const messagingAPI = {
   },
 
   // Message endpoints
-  getMessages: async (conversationId, page = 1) => {
+  // params: { before, after, limit } - keyset anchors are message ids
+  getMessages: async (conversationId, params = {}) => {
     const response = await api.get('/messaging/messages/', {
       params: {
         conversation: conversationId,
-        page: page,
+        ...params,
       },
     });
     return response.data;
@@ -1,4 +1,4 @@
-import { useState, useEffect, useRef } from 'react';
+import { useState, useEffect, useLayoutEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { toast } from 'react-toastify';
 import { FiArrowLeft } from 'react-icons/fi';
@@ -16,13 +16,20 @@ const ChatView = ({ conversationId }) => {
   const wsRef = useRef(null);
   const typingTimeoutRef = useRef(null);
   const messageRefs = useRef({});
+  const messagesContainerRef = useRef(null);
+  // Scroll height before older messages were prepended, to keep the viewport in place
+  const prependScrollRef = useRef(null);
+  const lastScrollTopRef = useRef(0);
 
   const { user, token } = useAuthStore();
   const {
     messages,
+    hasOlderMessages,
     fetchMessages,
+    fetchOlderMessages,
     addMessage,
     updateMessage,
+    markMessagesSeen,
     removeMessage,
     setTypingUser,
     setUserOnlineStatus,
@@ -33,12 +40,14 @@ const ChatView = ({ conversationId }) => {
   const [isConnected, setIsConnected] = useState(false);
   const [isSending, setIsSending] = useState(false);
   const [replyingTo, setReplyingTo] = useState(null);
+  const [isLoadingOlder, setIsLoadingOlder] = useState(false);
 
   const conversationMessages = messages[conversationId] || [];
 
   // Fetch messages when conversation changes
   useEffect(() => {
     if (conversationId) {
+      prependScrollRef.current = null;
       fetchMessages(conversationId);
       markConversationAsRead(conversationId);
     }
@@ -82,10 +91,10 @@ const ChatView = ({ conversationId }) => {
           break;
 
         case 'read_receipt':
-          // Update message read status
-          updateMessage(conversationId, data.message_id, {
-            status: 'seen',
-          });
+          // Read receipts are watermarks: everything up to message_id is read
+          if (data.user_id !== user.id) {
+            markMessagesSeen(conversationId, data.message_id, data.user_id);
+          }
           break;
 
         case 'user_status':
@@ -131,12 +140,47 @@ const ChatView = ({ conversationId }) => {
         wsRef.current = null;
       }
     };
-  }, [conversationId, token, user, addMessage, updateMessage, removeMessage, setTypingUser, setUserOnlineStatus]);
+  }, [conversationId, token, user, addMessage, updateMessage, markMessagesSeen, removeMessage, setTypingUser, setUserOnlineStatus]);
 
-  // Scroll to bottom when new messages arrive
+  // Scroll to bottom when a new message arrives at the end; prepended history keeps the position
+  const lastMessageId = conversationMessages[conversationMessages.length - 1]?.id;
   useEffect(() => {
     scrollToBottom();
-  }, [conversationMessages.length]);
+  }, [lastMessageId]);
+
+  const firstMessageId = conversationMessages[0]?.id;
+  useLayoutEffect(() => {
+    const container = messagesContainerRef.current;
+    if (!container || prependScrollRef.current === null) return;
+    container.scrollTop = container.scrollHeight - prependScrollRef.current;
+    prependScrollRef.current = null;
+  }, [firstMessageId]);
+
+  const loadOlderMessages = async () => {
+    if (isLoadingOlder || !hasOlderMessages[conversationId]) return;
+    const container = messagesContainerRef.current;
+    setIsLoadingOlder(true);
+    try {
+      if (container) {
+        prependScrollRef.current = container.scrollHeight - container.scrollTop;
+      }
+      await fetchOlderMessages(conversationId);
+    } catch (error) {
+      prependScrollRef.current = null;
+      toast.error(t('messages.failedToLoadMessages'));
+    } finally {
+      setIsLoadingOlder(false);
+    }
+  };
+
+  // Only an upward scroll near the top loads history, not the smooth scroll to the bottom
+  const handleMessagesScroll = (e) => {
+    const { scrollTop } = e.currentTarget;
+    if (scrollTop < 80 && scrollTop < lastScrollTopRef.current) {
+      loadOlderMessages();
+    }
+    lastScrollTopRef.current = scrollTop;
+  };
 
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
@@ -303,7 +347,22 @@ const ChatView = ({ conversationId }) => {
       )}
 
       {/* Messages */}
-      <div className="flex-1 overflow-y-auto p-4 space-y-4">
+      <div
+        ref={messagesContainerRef}
+        onScroll={handleMessagesScroll}
+        className="flex-1 overflow-y-auto p-4 space-y-4"
+      >
+        {hasOlderMessages[conversationId] && (
+          <div className="flex justify-center">
+            <button
+              onClick={loadOlderMessages}
+              disabled={isLoadingOlder}
+              className="text-sm text-blue-600 dark:text-blue-400 hover:underline disabled:opacity-50"
+            >
+              {isLoadingOlder ? t('common.loading') : t('messages.loadEarlier')}
+            </button>
+          </div>
+        )}
         {allMessages.length === 0 ? (
           <div className="flex items-center justify-center h-full text-gray-500 dark:text-gray-400">
             <p>{t('messages.noMessagesYet')}</p>
@@ -15,6 +15,8 @@ const ConfessionFollowers = () => {
   const { t } = useLanguage()
   const [confession, setConfession] = useState(null)
   const [followers, setFollowers] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [loading, setLoading] = useState(true)
   const [canViewFollowers, setCanViewFollowers] = useState(false)
 
@@ -41,7 +43,8 @@ const ConfessionFollowers = () => {
         setCanViewFollowers(true)
         // Fetch followers
         const followersData = await confessionAPI.getFollowers(slug)
-        setFollowers(followersData)
+        setFollowers(followersData.results)
+        setNextCursor(getCursor(followersData.next))
       } else {
         setCanViewFollowers(false)
         toast.error(t('followers.subscribeToView'))
@@ -54,6 +57,24 @@ const ConfessionFollowers = () => {
     }
   }
 
+  // The API pages followers with a cursor; keep only the cursor from the next link
+  const getCursor = (next) => (next ? new URL(next).searchParams.get('cursor') : null)
+
+  const loadMoreFollowers = async () => {
+    if (!nextCursor || loadingMore) return
+    setLoadingMore(true)
+    try {
+      const followersData = await confessionAPI.getFollowers(slug, { cursor: nextCursor })
+      setFollowers(prev => [...prev, ...followersData.results])
+      setNextCursor(getCursor(followersData.next))
+    } catch (error) {
+      toast.error(t('followers.failedToLoad'))
+      console.error(error)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   if (loading) return (
     <MainLayout>
       <Loading />
@@ -146,6 +167,17 @@ const ConfessionFollowers = () => {
                   </Link>
                 ))
               )}
+              {nextCursor && (
+                <div className="p-4 text-center">
+                  <button
+                    onClick={loadMoreFollowers}
+                    disabled={loadingMore}
+                    className="px-6 py-2 bg-blue-600 dark:bg-blue-500 text-white rounded-lg hover:bg-blue-700 dark:hover:bg-blue-600 transition-colors disabled:opacity-50"
+                  >
+                    {loadingMore ? t('common.loading') : t('followers.loadMore')}
+                  </button>
+                </div>
+              )}
             </div>
           )}
         </div>
@@ -6,6 +6,9 @@ const useMessagingStore = create((set, get) => ({
   conversations: [],
   currentConversation: null,
   messages: {},
+  hasOlderMessages: {},
+  // { conversationId: { userId: last read message id } }
+  readPositions: {},
   unreadCount: 0,
   isLoading: false,
   error: null,
@@ -53,6 +56,31 @@ const useMessagingStore = create((set, get) => ({
       },
     })),
 
+  // A message is 'seen' only once every member other than its sender has
+  // read past it, matching the backend's minimum-watermark rule
+  markMessagesSeen: (conversationId, upToMessageId, readerId) =>
+    set((state) => {
+      const positions = {
+        ...(state.readPositions[conversationId] || {}),
+        [readerId]: Math.max(state.readPositions[conversationId]?.[readerId] || 0, upToMessageId),
+      };
+      const isSeen = (msg) => {
+        const others = Object.entries(positions).filter(([userId]) => Number(userId) !== msg.sender?.id);
+        return others.length > 0 && others.every(([, lastRead]) => lastRead >= msg.id);
+      };
+      return {
+        readPositions: { ...state.readPositions, [conversationId]: positions },
+        messages: {
+          ...state.messages,
+          [conversationId]: state.messages[conversationId]?.map((msg) =>
+            msg.id <= upToMessageId && msg.status !== 'seen' && isSeen(msg)
+              ? { ...msg, status: 'seen' }
+              : msg
+          ),
+        },
+      };
+    }),
+
   removeMessage: (conversationId, messageId) =>
     set((state) => ({
       messages: {
@@ -100,19 +128,45 @@ const useMessagingStore = create((set, get) => ({
     }
   },
 
-  fetchMessages: async (conversationId, page = 1) => {
+  // Loads the newest page of a conversation
+  fetchMessages: async (conversationId) => {
     set({ isLoading: true, error: null });
     try {
-      const data = await messagingAPI.getMessages(conversationId, page);
-      const messages = data.results || data;
-      get().setMessages(conversationId, messages);
-      set({ isLoading: false });
+      const data = await messagingAPI.getMessages(conversationId);
+      get().setMessages(conversationId, data.results);
+      set((state) => ({
+        hasOlderMessages: { ...state.hasOlderMessages, [conversationId]: Boolean(data.older) },
+        readPositions: { ...state.readPositions, [conversationId]: data.read_positions || {} },
+        isLoading: false,
+      }));
     } catch (error) {
       set({ error: error.message, isLoading: false });
       throw error;
     }
   },
 
+  // Prepends the page just before the oldest loaded message
+  fetchOlderMessages: async (conversationId) => {
+    const existingMessages = get().messages[conversationId] || [];
+    if (!existingMessages.length || !get().hasOlderMessages[conversationId]) return;
+
+    try {
+      const data = await messagingAPI.getMessages(conversationId, {
+        before: existingMessages[0].id,
+      });
+      set((state) => ({
+        messages: {
+          ...state.messages,
+          [conversationId]: [...data.results, ...(state.messages[conversationId] || [])],
+        },
+        hasOlderMessages: { ...state.hasOlderMessages, [conversationId]: Boolean(data.older) },
+      }));
+    } catch (error) {
+      set({ error: error.message });
+      throw error;
+    }
+  },
+
   sendMessage: async (conversationId, content, attachmentFiles = [], replyToId = null) => {
     try {
       const messageData = {
@@ -255,6 +309,8 @@ const useMessagingStore = create((set, get) => ({
       conversations: [],
       currentConversation: null,
       messages: {},
+      hasOlderMessages: {},
+      readPositions: {},
       unreadCount: 0,
       isLoading: false,
       error: null,